@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+ORDER_COLUMNS = "id, user_id, items, total_price, status, created_at"
+PARTITION_MONTHS_AHEAD = 3
+
+
+def _add_months(value: datetime, months: int) -> datetime:
+    index = value.year * 12 + value.month - 1 + months
+    return value.replace(year=index // 12, month=index % 12 + 1)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    op.execute("ALTER TABLE orders RENAME TO orders_legacy")
+    op.execute("ALTER TABLE orders_legacy RENAME CONSTRAINT orders_pkey TO orders_legacy_pkey")
+    op.execute("ALTER INDEX ix_orders_user_id RENAME TO ix_orders_legacy_user_id")
+
+    op.execute(
+        """
+        CREATE TABLE orders (
+            id UUID NOT NULL,
+            user_id INTEGER NOT NULL REFERENCES users (id),
+            items JSON NOT NULL,
+            total_price DOUBLE PRECISION NOT NULL,
+            status order_status NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            CONSTRAINT orders_pkey PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    op.create_index("ix_orders_user_id_created_at", "orders", ["user_id", "created_at"], unique=False)
+    op.execute("CREATE TABLE orders_default PARTITION OF orders DEFAULT")
+
+    now = datetime.now(timezone.utc)
+    oldest = bind.scalar(sa.text("SELECT min(created_at) FROM orders_legacy")) or now
+    month = datetime(oldest.year, oldest.month, 1, tzinfo=timezone.utc)
+    last = _add_months(datetime(now.year, now.month, 1, tzinfo=timezone.utc), PARTITION_MONTHS_AHEAD)
+    while month <= last:
+        end = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE orders_p{month:%Y%m} PARTITION OF orders "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{end.isoformat()}')"
+        )
+        month = end
+
+    op.execute(f"INSERT INTO orders ({ORDER_COLUMNS}) SELECT {ORDER_COLUMNS} FROM orders_legacy")
+    op.drop_table("orders_legacy")
+
+    op.execute(
+        """
+        CREATE TABLE orders_archive (
+            id UUID NOT NULL,
+            user_id INTEGER NOT NULL,
+            items JSON NOT NULL,
+            total_price DOUBLE PRECISION NOT NULL,
+            status order_status NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            archived_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, created_at)
+        )
+        """
+    )
+    op.create_index("ix_orders_archive_user_id", "orders_archive", ["user_id"], unique=False)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    op.execute("ALTER TABLE orders RENAME TO orders_partitioned")
+    op.execute("ALTER TABLE orders_partitioned RENAME CONSTRAINT orders_pkey TO orders_partitioned_pkey")
+    op.create_table(
+        "orders",
+        sa.Column("id", sa.Uuid(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("items", sa.JSON(), nullable=False),
+        sa.Column("total_price", sa.Float(), nullable=False),
+        sa.Column(
+            "status",
+            postgresql.ENUM(name="order_status", create_type=False),
+            nullable=False,
+        ),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_orders_user_id", "orders", ["user_id"], unique=False)
+    op.execute(f"INSERT INTO orders ({ORDER_COLUMNS}) SELECT {ORDER_COLUMNS} FROM orders_archive")
+    op.execute(f"INSERT INTO orders ({ORDER_COLUMNS}) SELECT {ORDER_COLUMNS} FROM orders_partitioned")
+    op.execute("DROP TABLE orders_partitioned")
+    op.drop_index("ix_orders_archive_user_id", table_name="orders_archive")
+    op.drop_table("orders_archive")
@@ -2,11 +2,10 @@ from __future__ import annotations
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.config import settings
+from app.core.security import TokenError, decode_access_token
 from app.db.models.user import User
 from app.db.session import get_db
 
@@ -23,12 +22,12 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.algorithm])
+        payload = decode_access_token(token)
         subject = payload.get("sub")
         if subject is None:
             raise credentials_exception
         user_id = int(subject)
-    except (JWTError, ValueError):
+    except (TokenError, ValueError):
         raise credentials_exception
 
     user = await db.scalar(select(User).where(User.id == user_id))
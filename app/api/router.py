@@ -2,9 +2,11 @@ from __future__ import annotations
 
 from fastapi import APIRouter
 
-from app.api.routes import auth, orders
+from app.api.routes import auth, health, metrics, orders
 
 api_router = APIRouter()
 api_router.include_router(auth.router, tags=["auth"])
 api_router.include_router(orders.router, tags=["orders"])
 
+api_router.include_router(metrics.router, tags=["metrics"])
+api_router.include_router(health.router, tags=["health"])
@@ -38,5 +38,6 @@ async def login(form: OAuth2PasswordRequestForm = Depends(), db: AsyncSession =
     token = create_access_token(
         subject=str(user.id),
         expires_delta=timedelta(minutes=settings.access_token_exp_minutes),
+        tier=user.tier,
     )
     return Token(access_token=token)
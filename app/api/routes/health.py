@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+
+from app.core.startup import check_database
+
+router = APIRouter()
+
+
+@router.get("/health/live", include_in_schema=False)
+async def live() -> dict[str, str]:
+    return {"status": "ok"}
+
+
+@router.get("/health/ready", include_in_schema=False)
+async def ready(request: Request) -> JSONResponse:
+    if not getattr(request.app.state, "ready", False):
+        request.app.state.ready = await check_database()
+    if not request.app.state.ready:
+        return JSONResponse(status_code=503, content={"status": "starting"})
+    return JSONResponse(content={"status": "ready"})
@@ -1,24 +1,42 @@
 from __future__ import annotations
 
+import asyncio
+import json
 import logging
 import uuid
+from collections.abc import AsyncIterator
+from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_user
-from app.core.cache import cache_get_order, cache_set_order
+from app.core.cache import cache_get_order, cache_get_orders, cache_writer
+from app.core.config import settings
+from app.core.events import order_events, order_status_event
+from app.core.idempotency import (
+    IdempotencyConflict,
+    IdempotencyMismatch,
+    idempotency_begin,
+    idempotency_fingerprint,
+    idempotency_release,
+    idempotency_store_response,
+)
 from app.core.redis import get_redis
 from app.db.models.order import Order, OrderStatus
 from app.db.models.user import User
-from app.db.session import get_db
+from app.db.session import SessionLocal, get_db
+from app.export import EXPORT_MEDIA_TYPES, ExportFormat, export_filename, stream_user_orders
 from app.messaging.rabbit import publisher
 from app.schemas.order import OrderCreate, OrderPublic, OrderUpdateStatus
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+ORDERS_BATCH_MAX_IDS = 100
+
 
 def _calc_total(items: list[dict]) -> float:
     return float(sum(item["price"] * item["quantity"] for item in items))
@@ -29,25 +47,61 @@ async def create_order(
     payload: OrderCreate,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
+    idempotency_key: str | None = Header(default=None, alias="Idempotency-Key", min_length=1, max_length=255),
 ) -> OrderPublic:
+    user_id = current_user.id
+    lock_held = False
+    fingerprint = idempotency_fingerprint(payload.model_dump(mode="json"))
+    if idempotency_key is not None:
+        # A duplicate may wait for the first request here; don't keep a pooled connection
+        # checked out (get_current_user already opened a transaction) while polling Redis.
+        await db.rollback()
+        try:
+            redis = get_redis()
+            cached = await idempotency_begin(redis, user_id, idempotency_key, fingerprint)
+            if cached is not None:
+                return OrderPublic.model_validate(cached)
+            lock_held = True
+        except IdempotencyConflict:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A request with this Idempotency-Key is still in progress",
+            )
+        except IdempotencyMismatch:
+            raise HTTPException(
+                status_code=422,
+                detail="Idempotency-Key was already used with a different request body",
+            )
+        except Exception as exc:
+            logger.warning("Idempotency check failed (key=%s), proceeding without it: %s", idempotency_key, exc)
+
     items = [item.model_dump() for item in payload.items]
     order = Order(
-        user_id=current_user.id,
+        user_id=user_id,
         items=items,
         total_price=_calc_total(items),
         status=OrderStatus.PENDING,
     )
     db.add(order)
-    await db.commit()
-    await db.refresh(order)
-
-    payload_out = OrderPublic.model_validate(order, from_attributes=True).model_dump(mode="json")
+    stored = False
     try:
-        redis = get_redis()
-        await cache_set_order(redis, order.id, payload_out)
-    except Exception as exc:
-        logger.debug("Failed to cache order %s: %s", order.id, exc)
-        pass
+        await db.commit()
+        await db.refresh(order)
+        payload_out = OrderPublic.model_validate(order, from_attributes=True).model_dump(mode="json")
+        if lock_held:
+            try:
+                await idempotency_store_response(get_redis(), user_id, idempotency_key, fingerprint, payload_out)
+                stored = True
+            except Exception as exc:
+                logger.warning("Failed to store idempotent response (key=%s): %s", idempotency_key, exc)
+    finally:
+        if lock_held and not stored:
+            try:
+                await idempotency_release(get_redis(), user_id, idempotency_key)
+            except Exception as exc:
+                logger.debug("Failed to release idempotency lock %s: %s", idempotency_key, exc)
+    cache_writer.enqueue(order.id, payload_out)
+    cache_writer.publish(order_status_event(payload_out))
     try:
         await publisher.publish_json({"type": "new_order", "order_id": str(order.id), "user_id": order.user_id})
     except Exception as exc:
@@ -55,6 +109,89 @@ async def create_order(
     return OrderPublic.model_validate(payload_out)
 
 
+def _parse_order_ids(raw_ids: list[str]) -> list[uuid.UUID]:
+    order_ids: list[uuid.UUID] = []
+    seen: set[uuid.UUID] = set()
+    for raw in raw_ids:
+        for part in raw.split(","):
+            part = part.strip()
+            if not part:
+                continue
+            try:
+                order_id = uuid.UUID(part)
+            except ValueError:
+                raise HTTPException(status_code=422, detail=f"Invalid order id: {part}")
+            if order_id not in seen:
+                seen.add(order_id)
+                order_ids.append(order_id)
+    if not order_ids:
+        raise HTTPException(status_code=422, detail="At least one order id is required")
+    if len(order_ids) > ORDERS_BATCH_MAX_IDS:
+        raise HTTPException(status_code=422, detail=f"At most {ORDERS_BATCH_MAX_IDS} order ids are allowed")
+    return order_ids
+
+
+@router.get("/orders/", response_model=list[OrderPublic])
+async def get_orders_batch(
+    ids: list[str] = Query(),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> list[OrderPublic]:
+    order_ids = _parse_order_ids(ids)
+
+    found: dict[uuid.UUID, dict] = {}
+    try:
+        redis = get_redis()
+        found = await cache_get_orders(redis, order_ids)
+    except Exception as exc:
+        logger.debug("Batch cache read failed: %s", exc)
+
+    missing = [order_id for order_id in order_ids if order_id not in found]
+    if missing:
+        orders = (await db.scalars(select(Order).where(Order.id.in_(missing)))).all()
+        loaded = {
+            order.id: OrderPublic.model_validate(order, from_attributes=True).model_dump(mode="json")
+            for order in orders
+        }
+        for order_id, order_payload in loaded.items():
+            cache_writer.enqueue(order_id, order_payload)
+        found.update(loaded)
+
+    return [
+        OrderPublic.model_validate(found[order_id])
+        for order_id in order_ids
+        if order_id in found and found[order_id].get("user_id") == current_user.id
+    ]
+
+
+@router.get("/orders/stream/")
+async def stream_order_events(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> StreamingResponse:
+    user_id = current_user.id
+    # The stream can stay open for hours; do not hold a pooled DB connection for it.
+    await db.close()
+
+    async def event_source() -> AsyncIterator[str]:
+        async with order_events.subscribe(user_id) as queue:
+            yield ": connected\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=settings.order_events_keepalive_seconds)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/orders/{order_id}/", response_model=OrderPublic)
 async def get_order(
     order_id: uuid.UUID,
@@ -78,12 +215,7 @@ async def get_order(
     if order.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Forbidden")
     payload = OrderPublic.model_validate(order, from_attributes=True).model_dump(mode="json")
-    try:
-        redis = get_redis()
-        await cache_set_order(redis, order_id, payload)
-    except Exception as exc:
-        logger.debug("Cache write failed for order %s: %s", order_id, exc)
-        pass
+    cache_writer.enqueue(order_id, payload)
     return OrderPublic.model_validate(payload)
 
 
@@ -104,24 +236,48 @@ async def update_order_status(
     await db.commit()
     await db.refresh(order)
     payload_out = OrderPublic.model_validate(order, from_attributes=True).model_dump(mode="json")
-    try:
-        redis = get_redis()
-        await cache_set_order(redis, order_id, payload_out)
-    except Exception as exc:
-        logger.debug("Cache write failed for order %s: %s", order_id, exc)
-        pass
+    cache_writer.invalidate(order_id)
+    cache_writer.publish(order_status_event(payload_out))
     return OrderPublic.model_validate(payload_out)
 
 
 @router.get("/orders/user/{user_id}/", response_model=list[OrderPublic])
 async def list_user_orders(
     user_id: int,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ) -> list[OrderPublic]:
     if user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Forbidden")
-    orders = (
-        await db.scalars(select(Order).where(Order.user_id == user_id).order_by(Order.created_at.desc()))
-    ).all()
+    query = select(Order).where(Order.user_id == user_id)
+    if created_from is not None:
+        query = query.where(Order.created_at >= created_from)
+    if created_to is not None:
+        query = query.where(Order.created_at < created_to)
+    orders = (await db.scalars(query.order_by(Order.created_at.desc()))).all()
     return [OrderPublic.model_validate(order, from_attributes=True) for order in orders]
+
+
+@router.get("/orders/user/{user_id}/export/")
+async def export_user_orders(
+    user_id: int,
+    fmt: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> StreamingResponse:
+    if user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Forbidden")
+    await db.close()
+
+    async def body() -> AsyncIterator[bytes]:
+        async with SessionLocal() as export_db:
+            async for chunk in stream_user_orders(export_db, user_id, fmt, settings.export_chunk_size):
+                yield chunk
+
+    return StreamingResponse(
+        body(),
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{export_filename(user_id, fmt)}"'},
+    )
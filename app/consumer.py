@@ -5,33 +5,136 @@ import json
 import logging
 
 import aio_pika
+from aio_pika.abc import AbstractChannel, AbstractIncomingMessage
 
 from app.core.config import settings
-from app.worker.tasks import process_order
+from app.messaging.topology import dead_letter, declare_new_order_topology, retry_later
+from app.worker.tasks import process_order, process_orders_batch
 
 logger = logging.getLogger(__name__)
 
 
+class InvalidMessage(Exception):
+    pass
+
+
+class OrderBatcher:
+    def __init__(self, channel: AbstractChannel, size: int, max_wait_seconds: float) -> None:
+        self._channel = channel
+        self._size = size
+        self._max_wait_seconds = max_wait_seconds
+        self._order_ids: list[str] = []
+        self._messages: list[AbstractIncomingMessage] = []
+        self._lock = asyncio.Lock()
+        self._timer: asyncio.Task[None] | None = None
+
+    async def add(self, message: AbstractIncomingMessage, order_id: str) -> None:
+        async with self._lock:
+            self._messages.append(message)
+            self._order_ids.append(order_id)
+            if len(self._messages) >= self._size:
+                await self._flush_locked()
+            elif self._timer is None:
+                self._timer = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self._max_wait_seconds)
+        async with self._lock:
+            self._timer = None
+            await self._flush_locked()
+
+    async def _flush_locked(self) -> None:
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+        self._timer = None
+        order_ids, self._order_ids = self._order_ids, []
+        messages, self._messages = self._messages, []
+        if not messages:
+            return
+        try:
+            process_orders_batch.delay(order_ids, settings.order_processed_status or None)
+            logger.info("Scheduled process_orders_batch for %s orders", len(order_ids))
+        except Exception as exc:
+            logger.warning("Failed to schedule order batch of %s messages: %s", len(messages), exc)
+            for message in messages:
+                await _retry_or_requeue(self._channel, message, str(exc))
+            return
+        for message in messages:
+            await message.ack()
+
+
+def _parse_order_id(message: AbstractIncomingMessage) -> str | None:
+    try:
+        payload = json.loads(message.body.decode("utf-8"))
+    except Exception as exc:
+        raise InvalidMessage(f"invalid payload: {exc}") from exc
+    if not isinstance(payload, dict):
+        raise InvalidMessage("payload is not an object")
+    if payload.get("type") != "new_order":
+        return None
+    order_id = payload.get("order_id")
+    if not isinstance(order_id, str) or not order_id:
+        raise InvalidMessage("missing order_id")
+    return order_id
+
+
+async def _retry_or_requeue(channel: AbstractChannel, message: AbstractIncomingMessage, reason: str) -> None:
+    try:
+        await retry_later(channel, message, reason)
+    except Exception as exc:
+        logger.warning("Failed to schedule retry, requeueing message: %s", exc)
+        await asyncio.sleep(1.0)
+        await message.nack(requeue=True)
+        return
+    await message.ack()
+
+
+async def handle_message(
+    channel: AbstractChannel,
+    message: AbstractIncomingMessage,
+    batcher: OrderBatcher | None,
+) -> None:
+    try:
+        order_id = _parse_order_id(message)
+    except InvalidMessage as exc:
+        try:
+            await dead_letter(channel, message, str(exc))
+        except Exception as publish_exc:
+            logger.warning("Failed to dead-letter message, requeueing: %s", publish_exc)
+            await asyncio.sleep(1.0)
+            await message.nack(requeue=True)
+            return
+        await message.ack()
+        return
+    if order_id is None:
+        await message.ack()
+        return
+    if batcher is not None:
+        await batcher.add(message, order_id)
+        return
+    try:
+        process_order.delay(order_id, settings.order_processed_status or None)
+    except Exception as exc:
+        logger.warning("Failed to schedule process_order for %s: %s", order_id, exc)
+        await _retry_or_requeue(channel, message, str(exc))
+        return
+    logger.info("Scheduled process_order for %s", order_id)
+    await message.ack()
+
+
 async def main() -> None:
     connection = await aio_pika.connect_robust(settings.rabbitmq_url)
     async with connection:
         channel = await connection.channel()
-        queue = await channel.declare_queue(settings.rabbitmq_queue_new_order, durable=True)
+        batcher: OrderBatcher | None = None
+        if settings.consumer_batch_size > 1:
+            await channel.set_qos(prefetch_count=settings.consumer_batch_size * 2)
+            batcher = OrderBatcher(channel, settings.consumer_batch_size, settings.consumer_batch_max_wait_seconds)
+        queue = await declare_new_order_topology(channel)
 
         async with queue.iterator() as queue_iter:
             async for message in queue_iter:
-                async with message.process():
-                    try:
-                        payload = json.loads(message.body.decode("utf-8"))
-                    except Exception as exc:
-                        logger.warning("Invalid message payload: %s", exc)
-                        continue
-                    if payload.get("type") != "new_order":
-                        continue
-                    order_id = payload.get("order_id")
-                    if isinstance(order_id, str) and order_id:
-                        process_order.delay(order_id)
-                        logger.info("Scheduled process_order for %s", order_id)
+                await handle_message(channel, message, batcher)
 
 
 if __name__ == "__main__":
@@ -2,11 +2,17 @@ from __future__ import annotations
 
 import asyncio
 import json
+import logging
 import uuid
+from collections.abc import Callable
 from typing import Any
 
 from redis.asyncio import Redis
 
+from app.core.config import settings
+from app.core.redis import get_redis, redis_breaker
+
+logger = logging.getLogger(__name__)
 
 ORDER_CACHE_TTL_SECONDS = 300
 
@@ -16,7 +22,7 @@ def order_cache_key(order_id: uuid.UUID) -> str:
 
 
 async def cache_get_order(redis: Redis, order_id: uuid.UUID) -> dict[str, Any] | None:
-    raw = await asyncio.wait_for(redis.get(order_cache_key(order_id)), timeout=2.0)
+    raw = await redis_breaker.call(redis.get, order_cache_key(order_id), timeout=2.0)
     if not raw:
         return None
     try:
@@ -25,8 +31,144 @@ async def cache_get_order(redis: Redis, order_id: uuid.UUID) -> dict[str, Any] |
         return None
 
 
-async def cache_set_order(redis: Redis, order_id: uuid.UUID, payload: dict[str, Any]) -> None:
-    await asyncio.wait_for(
-        redis.set(order_cache_key(order_id), json.dumps(payload), ex=ORDER_CACHE_TTL_SECONDS),
-        timeout=2.0,
-    )
+async def cache_get_orders(redis: Redis, order_ids: list[uuid.UUID]) -> dict[uuid.UUID, dict[str, Any]]:
+    if not order_ids:
+        return {}
+    raws = await redis_breaker.call(redis.mget, [order_cache_key(order_id) for order_id in order_ids], timeout=2.0)
+    cached: dict[uuid.UUID, dict[str, Any]] = {}
+    for order_id, raw in zip(order_ids, raws):
+        if not raw:
+            continue
+        try:
+            cached[order_id] = json.loads(raw)
+        except json.JSONDecodeError:
+            continue
+    return cached
+
+
+async def cache_set_orders(redis: Redis, payloads: dict[uuid.UUID, dict[str, Any]]) -> None:
+    if not payloads:
+        return
+    async with redis.pipeline(transaction=False) as pipe:
+        for order_id, payload in payloads.items():
+            pipe.set(order_cache_key(order_id), json.dumps(payload), ex=ORDER_CACHE_TTL_SECONDS)
+        await redis_breaker.call(pipe.execute, timeout=2.0)
+
+
+class CacheWriter:
+    def __init__(
+        self,
+        redis_factory: Callable[[], Redis],
+        max_pending: int,
+        flush_delay_seconds: float,
+        retry_delay_seconds: float = 1.0,
+    ) -> None:
+        self._redis_factory = redis_factory
+        self._max_pending = max_pending
+        self._flush_delay_seconds = flush_delay_seconds
+        self._retry_delay_seconds = retry_delay_seconds
+        # None is a tombstone: the key is deleted on flush.
+        self._pending: dict[uuid.UUID, dict[str, Any] | None] = {}
+        self._events: list[dict[str, Any]] = []
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task[None] | None = None
+        self.dropped = 0
+        self.events_dropped = 0
+
+    def enqueue(self, order_id: uuid.UUID, payload: dict[str, Any]) -> bool:
+        if order_id in self._pending:
+            if self._pending[order_id] is None:
+                # A pending invalidation wins over a fill that may have read the old row.
+                return False
+        elif len(self._pending) >= self._max_pending:
+            self.dropped += 1
+            logger.debug("Write-behind cache queue is full, dropping order %s", order_id)
+            return False
+        self._pending[order_id] = payload
+        self._wake()
+        return True
+
+    def invalidate(self, order_id: uuid.UUID) -> None:
+        # Mutations bypass max_pending: losing one would leave a stale entry for the full TTL.
+        self._pending[order_id] = None
+        self._wake()
+
+    def publish(self, event: dict[str, Any]) -> bool:
+        if len(self._events) >= self._max_pending:
+            self.events_dropped += 1
+            logger.debug("Write-behind event queue is full, dropping %s", event.get("type"))
+            return False
+        self._events.append(event)
+        self._wake()
+        return True
+
+    async def flush(self) -> bool:
+        if not self._pending and not self._events:
+            return True
+        batch, self._pending = self._pending, {}
+        events, self._events = self._events, []
+        try:
+            async with self._redis_factory().pipeline(transaction=False) as pipe:
+                for order_id, payload in batch.items():
+                    if payload is None:
+                        pipe.delete(order_cache_key(order_id))
+                    else:
+                        pipe.set(order_cache_key(order_id), json.dumps(payload), ex=ORDER_CACHE_TTL_SECONDS)
+                # Events go after the key updates so a subscriber that re-reads the order sees the new state.
+                for event in events:
+                    pipe.publish(settings.order_events_channel, json.dumps(event))
+                await redis_breaker.call(pipe.execute, timeout=2.0)
+        except Exception as exc:
+            tombstones = [order_id for order_id, payload in batch.items() if payload is None]
+            for order_id in tombstones:
+                self._pending[order_id] = None
+            self.dropped += len(batch) - len(tombstones)
+            self.events_dropped += len(events)
+            logger.debug(
+                "Write-behind cache flush failed (%s fills and %s events dropped, %s invalidations kept): %s",
+                len(batch) - len(tombstones),
+                len(events),
+                len(tombstones),
+                exc,
+            )
+            return False
+        return True
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def _wake(self) -> None:
+        self._ensure_running()
+        assert self._wakeup is not None
+        self._wakeup.set()
+
+    def _ensure_running(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._task is not None and not self._task.done() and self._task.get_loop() is loop:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = loop.create_task(self._run(self._wakeup))
+
+    async def _run(self, wakeup: asyncio.Event) -> None:
+        while True:
+            await wakeup.wait()
+            wakeup.clear()
+            if self._flush_delay_seconds > 0:
+                await asyncio.sleep(self._flush_delay_seconds)
+            if not await self.flush() and self._pending:
+                await asyncio.sleep(self._retry_delay_seconds)
+                wakeup.set()
+
+
+cache_writer = CacheWriter(
+    redis_factory=get_redis,
+    max_pending=settings.cache_write_behind_max_pending,
+    flush_delay_seconds=settings.cache_write_behind_delay_seconds,
+)
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import asyncio
+import enum
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, name: str) -> None:
+        super().__init__(f"Circuit breaker '{name}' is open")
+        self.name = name
+
+
+class CircuitState(str, enum.Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        reset_timeout_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self._failure_threshold = failure_threshold
+        self._reset_timeout_seconds = reset_timeout_seconds
+        self._clock = clock
+        self._state = CircuitState.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self.failures_total = 0
+        self.rejections_total = 0
+        self.opened_total = 0
+
+    @property
+    def state(self) -> CircuitState:
+        return self._state
+
+    def before_call(self) -> None:
+        if self._state is CircuitState.OPEN:
+            if self._clock() - self._opened_at < self._reset_timeout_seconds:
+                self.rejections_total += 1
+                raise CircuitOpenError(self.name)
+            self._state = CircuitState.HALF_OPEN
+            self._trial_in_flight = False
+        if self._state is CircuitState.HALF_OPEN:
+            if self._trial_in_flight:
+                self.rejections_total += 1
+                raise CircuitOpenError(self.name)
+            self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        self._state = CircuitState.CLOSED
+        self._consecutive_failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures_total += 1
+        self._consecutive_failures += 1
+        if self._state is CircuitState.HALF_OPEN or self._consecutive_failures >= self._failure_threshold:
+            self._open()
+
+    def release_trial(self) -> None:
+        self._trial_in_flight = False
+
+    async def call(self, func: Callable[..., Awaitable[T]], *args: Any, timeout: float | None, **kwargs: Any) -> T:
+        self.before_call()
+        try:
+            result = await asyncio.wait_for(func(*args, **kwargs), timeout=timeout)
+        except asyncio.CancelledError:
+            self.release_trial()
+            raise
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+    def _open(self) -> None:
+        if self._state is not CircuitState.OPEN:
+            self.opened_total += 1
+        self._state = CircuitState.OPEN
+        self._opened_at = self._clock()
+        self._trial_in_flight = False
+
+
+breakers: dict[str, CircuitBreaker] = {}
+
+
+def register_breaker(breaker: CircuitBreaker) -> CircuitBreaker:
+    breakers[breaker.name] = breaker
+    return breaker
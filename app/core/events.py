@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+from app.core.config import settings
+from app.core.redis import get_redis, redis_breaker
+
+logger = logging.getLogger(__name__)
+
+
+def order_status_event(order: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "type": "order_status",
+        "order_id": str(order["id"]),
+        "user_id": order["user_id"],
+        "status": order["status"],
+    }
+
+
+class OrderEventBroker:
+    def __init__(self, channel: str, queue_size: int) -> None:
+        self._channel = channel
+        self._queue_size = queue_size
+        self._subscribers: dict[int, set[asyncio.Queue[dict[str, Any]]]] = {}
+        self._task: asyncio.Task[None] | None = None
+
+    @asynccontextmanager
+    async def subscribe(self, user_id: int) -> AsyncIterator[asyncio.Queue[dict[str, Any]]]:
+        queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize=self._queue_size)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen())
+        try:
+            yield queue
+        finally:
+            queues = self._subscribers.get(user_id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[user_id]
+            if not self._subscribers and self._task is not None:
+                self._task.cancel()
+                self._task = None
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = get_redis().pubsub()
+            try:
+                await redis_breaker.call(pubsub.subscribe, self._channel, timeout=settings.redis_socket_timeout_seconds)
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message is not None and message.get("type") == "message":
+                        self._dispatch(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("Order events subscription failed, reconnecting: %s", exc)
+                await asyncio.sleep(1.0)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception as exc:
+                    logger.debug("Failed to close order events subscription: %s", exc)
+
+    def _dispatch(self, raw: str) -> None:
+        try:
+            event = json.loads(raw)
+        except json.JSONDecodeError:
+            return
+        for queue in self._subscribers.get(event.get("user_id"), ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+
+order_events = OrderEventBroker(
+    channel=settings.order_events_channel,
+    queue_size=settings.order_events_queue_size,
+)
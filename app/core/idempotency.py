@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import time
+from typing import Any
+
+from redis.asyncio import Redis
+
+from app.core.config import settings
+from app.core.redis import redis_breaker
+
+
+class IdempotencyConflict(Exception):
+    pass
+
+
+class IdempotencyMismatch(Exception):
+    pass
+
+
+def idempotency_response_key(user_id: int, key: str) -> str:
+    return f"idem:{user_id}:{key}:response"
+
+
+def idempotency_lock_key(user_id: int, key: str) -> str:
+    return f"idem:{user_id}:{key}:lock"
+
+
+def idempotency_fingerprint(payload: dict[str, Any]) -> str:
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+async def idempotency_get_record(redis: Redis, user_id: int, key: str) -> dict[str, Any] | None:
+    raw = await redis_breaker.call(
+        redis.get,
+        idempotency_response_key(user_id, key),
+        timeout=settings.redis_socket_timeout_seconds,
+    )
+    if not raw:
+        return None
+    try:
+        record = json.loads(raw)
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(record, dict):
+        return None
+    if "response" not in record:
+        # Responses stored before fingerprints were added replay without the body check.
+        return {"fingerprint": None, "response": record}
+    return record
+
+
+async def idempotency_acquire(redis: Redis, user_id: int, key: str) -> bool:
+    acquired = await redis_breaker.call(
+        redis.set,
+        idempotency_lock_key(user_id, key),
+        "1",
+        nx=True,
+        ex=settings.idempotency_lock_ttl_seconds,
+        timeout=settings.redis_socket_timeout_seconds,
+    )
+    return bool(acquired)
+
+
+async def idempotency_release(redis: Redis, user_id: int, key: str) -> None:
+    await redis_breaker.call(
+        redis.delete,
+        idempotency_lock_key(user_id, key),
+        timeout=settings.redis_socket_timeout_seconds,
+    )
+
+
+async def idempotency_store_response(
+    redis: Redis,
+    user_id: int,
+    key: str,
+    fingerprint: str,
+    payload: dict[str, Any],
+) -> None:
+    record = json.dumps({"fingerprint": fingerprint, "response": payload})
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.set(idempotency_response_key(user_id, key), record, ex=settings.idempotency_ttl_seconds)
+        pipe.delete(idempotency_lock_key(user_id, key))
+        await redis_breaker.call(pipe.execute, timeout=settings.redis_socket_timeout_seconds)
+
+
+async def idempotency_begin(redis: Redis, user_id: int, key: str, fingerprint: str) -> dict[str, Any] | None:
+    # Returns the stored response, or None once this request owns the key. A duplicate keeps
+    # retrying the lock, so it takes over when the first request fails and releases it.
+    deadline = time.monotonic() + settings.idempotency_wait_seconds
+    delay = 0.05
+    while True:
+        record = await idempotency_get_record(redis, user_id, key)
+        if record is not None:
+            if record["fingerprint"] not in (None, fingerprint):
+                raise IdempotencyMismatch(key)
+            return record["response"]
+        if await idempotency_acquire(redis, user_id, key):
+            return None
+        if time.monotonic() >= deadline:
+            raise IdempotencyConflict(key)
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 0.5)
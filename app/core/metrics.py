@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from collections import defaultdict
+
+from app.core.cache import cache_writer
+from app.core.circuit_breaker import CircuitState, breakers
+
+
+class CompressionStats:
+    def __init__(self) -> None:
+        self.responses: dict[str, int] = defaultdict(int)
+        self.input_bytes: dict[str, int] = defaultdict(int)
+        self.output_bytes: dict[str, int] = defaultdict(int)
+        self.skipped_responses = 0
+        self.skipped_bytes = 0
+
+    def record_response(self, encoding: str | None) -> None:
+        if encoding is None:
+            self.skipped_responses += 1
+        else:
+            self.responses[encoding] += 1
+
+    def record(self, encoding: str, input_bytes: int, output_bytes: int) -> None:
+        self.input_bytes[encoding] += input_bytes
+        self.output_bytes[encoding] += output_bytes
+
+    def record_skipped(self, size: int) -> None:
+        self.skipped_bytes += size
+
+
+compression_stats = CompressionStats()
+
+_STATE_VALUES = {
+    CircuitState.CLOSED: 0,
+    CircuitState.HALF_OPEN: 1,
+    CircuitState.OPEN: 2,
+}
+
+
+def render_metrics() -> str:
+    lines = [
+        "# HELP circuit_breaker_state Circuit breaker state (0=closed, 1=half_open, 2=open).",
+        "# TYPE circuit_breaker_state gauge",
+    ]
+    for name, breaker in sorted(breakers.items()):
+        lines.append(f'circuit_breaker_state{{name="{name}"}} {_STATE_VALUES[breaker.state]}')
+    lines += [
+        "# HELP circuit_breaker_failures_total Calls that failed while passing through the breaker.",
+        "# TYPE circuit_breaker_failures_total counter",
+    ]
+    for name, breaker in sorted(breakers.items()):
+        lines.append(f'circuit_breaker_failures_total{{name="{name}"}} {breaker.failures_total}')
+    lines += [
+        "# HELP circuit_breaker_rejections_total Calls skipped because the breaker was open.",
+        "# TYPE circuit_breaker_rejections_total counter",
+    ]
+    for name, breaker in sorted(breakers.items()):
+        lines.append(f'circuit_breaker_rejections_total{{name="{name}"}} {breaker.rejections_total}')
+    lines += [
+        "# HELP circuit_breaker_opened_total Transitions into the open state.",
+        "# TYPE circuit_breaker_opened_total counter",
+    ]
+    for name, breaker in sorted(breakers.items()):
+        lines.append(f'circuit_breaker_opened_total{{name="{name}"}} {breaker.opened_total}')
+    lines += [
+        "# HELP order_cache_write_behind_dropped_total Order cache writes dropped by the write-behind queue.",
+        "# TYPE order_cache_write_behind_dropped_total counter",
+        f"order_cache_write_behind_dropped_total {cache_writer.dropped}",
+        "# HELP order_events_dropped_total Order status events dropped by the write-behind queue.",
+        "# TYPE order_events_dropped_total counter",
+        f"order_events_dropped_total {cache_writer.events_dropped}",
+        "# HELP http_compressed_responses_total Responses compressed by the compression middleware.",
+        "# TYPE http_compressed_responses_total counter",
+    ]
+    for encoding, count in sorted(compression_stats.responses.items()):
+        lines.append(f'http_compressed_responses_total{{encoding="{encoding}"}} {count}')
+    lines += [
+        "# HELP http_compression_uncompressed_bytes_total Response body bytes before compression.",
+        "# TYPE http_compression_uncompressed_bytes_total counter",
+    ]
+    for encoding, size in sorted(compression_stats.input_bytes.items()):
+        lines.append(f'http_compression_uncompressed_bytes_total{{encoding="{encoding}"}} {size}')
+    lines += [
+        "# HELP http_compression_compressed_bytes_total Response body bytes sent after compression.",
+        "# TYPE http_compression_compressed_bytes_total counter",
+    ]
+    for encoding, size in sorted(compression_stats.output_bytes.items()):
+        lines.append(f'http_compression_compressed_bytes_total{{encoding="{encoding}"}} {size}')
+    lines += [
+        "# HELP http_compression_skipped_responses_total Responses sent uncompressed (too small or excluded type).",
+        "# TYPE http_compression_skipped_responses_total counter",
+        f"http_compression_skipped_responses_total {compression_stats.skipped_responses}",
+        "# HELP http_compression_skipped_bytes_total Body bytes of responses sent uncompressed.",
+        "# TYPE http_compression_skipped_bytes_total counter",
+        f"http_compression_skipped_bytes_total {compression_stats.skipped_bytes}",
+    ]
+    return "\n".join(lines) + "\n"
@@ -1,11 +1,31 @@
 from __future__ import annotations
 
+from redis import Redis as SyncRedis
 from redis.asyncio import Redis
 
+from app.core.circuit_breaker import CircuitBreaker, register_breaker
 from app.core.config import settings
 
 
 _redis: Redis | None = None
+_rate_limit_redis: Redis | None = None
+_sync_redis: SyncRedis | None = None
+
+redis_breaker = register_breaker(
+    CircuitBreaker(
+        name="redis",
+        failure_threshold=settings.redis_breaker_failure_threshold,
+        reset_timeout_seconds=settings.redis_breaker_reset_seconds,
+    )
+)
+
+rate_limit_redis_breaker = register_breaker(
+    CircuitBreaker(
+        name="redis_rate_limit",
+        failure_threshold=settings.redis_breaker_failure_threshold,
+        reset_timeout_seconds=settings.redis_breaker_reset_seconds,
+    )
+)
 
 
 def get_redis() -> Redis:
@@ -19,3 +39,29 @@ def get_redis() -> Redis:
             retry_on_timeout=True,
         )
     return _redis
+
+
+def get_rate_limit_redis() -> Redis:
+    global _rate_limit_redis
+    if _rate_limit_redis is None:
+        _rate_limit_redis = Redis.from_url(
+            settings.rate_limit_redis_url,
+            decode_responses=True,
+            socket_connect_timeout=settings.redis_connect_timeout_seconds,
+            socket_timeout=settings.redis_socket_timeout_seconds,
+            retry_on_timeout=True,
+        )
+    return _rate_limit_redis
+
+
+def get_sync_redis() -> SyncRedis:
+    global _sync_redis
+    if _sync_redis is None:
+        _sync_redis = SyncRedis.from_url(
+            settings.redis_url,
+            decode_responses=True,
+            socket_connect_timeout=settings.redis_connect_timeout_seconds,
+            socket_timeout=settings.redis_socket_timeout_seconds,
+            retry_on_timeout=True,
+        )
+    return _sync_redis
@@ -1,29 +1,140 @@
 from __future__ import annotations
 
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Protocol
 
-from jose import jwt
-from passlib.context import CryptContext
+from jose import JWTError
+from jose import jwt as jose_jwt
 
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+
+class TokenError(Exception):
+    pass
+
+
+class JWTBackend(Protocol):
+    name: str
+
+    def encode(self, payload: dict[str, Any], key: str, algorithm: str) -> str: ...
+
+    def decode(self, token: str, key: str, algorithm: str) -> dict[str, Any]: ...
+
+
+class JoseBackend:
+    name = "jose"
+
+    def encode(self, payload: dict[str, Any], key: str, algorithm: str) -> str:
+        return jose_jwt.encode(payload, key, algorithm=algorithm)
+
+    def decode(self, token: str, key: str, algorithm: str) -> dict[str, Any]:
+        try:
+            return jose_jwt.decode(token, key, algorithms=[algorithm])
+        except JWTError as exc:
+            raise TokenError(str(exc)) from exc
+
+
+class PyJWTBackend:
+    name = "pyjwt"
+
+    def __init__(self) -> None:
+        import jwt
+
+        self._jwt = jwt
+
+    def encode(self, payload: dict[str, Any], key: str, algorithm: str) -> str:
+        return self._jwt.encode(payload, key, algorithm=algorithm)
+
+    def decode(self, token: str, key: str, algorithm: str) -> dict[str, Any]:
+        try:
+            return self._jwt.decode(token, key, algorithms=[algorithm])
+        except self._jwt.PyJWTError as exc:
+            raise TokenError(str(exc)) from exc
+
+
+@lru_cache(maxsize=1)
+def get_jwt_backend() -> JWTBackend:
+    if settings.jwt_backend == "pyjwt":
+        try:
+            return PyJWTBackend()
+        except ImportError as exc:
+            raise RuntimeError("JWT_BACKEND=pyjwt requires the PyJWT package") from exc
+    return JoseBackend()
+
+
+class TokenCache:
+    def __init__(self, max_size: int) -> None:
+        self._max_size = max_size
+        self._entries: OrderedDict[str, tuple[dict[str, Any], float]] = OrderedDict()
+
+    def get(self, token: str, now: float) -> dict[str, Any] | None:
+        entry = self._entries.get(token)
+        if entry is None:
+            return None
+        claims, expires_at = entry
+        if expires_at <= now:
+            del self._entries[token]
+            return None
+        self._entries.move_to_end(token)
+        return claims
+
+    def put(self, token: str, claims: dict[str, Any]) -> None:
+        expires_at = claims.get("exp")
+        if self._max_size <= 0 or not isinstance(expires_at, (int, float)):
+            return
+        self._entries[token] = (claims, float(expires_at))
+        self._entries.move_to_end(token)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+token_cache = TokenCache(max_size=settings.jwt_cache_size)
+
+
+@lru_cache(maxsize=1)
+def get_pwd_context() -> CryptContext:
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["argon2"], deprecated="auto")
 
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 
 def verify_password(password: str, password_hash: str) -> bool:
-    return pwd_context.verify(password, password_hash)
+    return get_pwd_context().verify(password, password_hash)
 
 
-def create_access_token(subject: str, expires_delta: timedelta | None = None) -> str:
+def create_access_token(
+    subject: str,
+    expires_delta: timedelta | None = None,
+    tier: str | None = None,
+) -> str:
     expire = datetime.now(timezone.utc) + (
         expires_delta
         if expires_delta is not None
         else timedelta(minutes=settings.access_token_exp_minutes)
     )
     payload: dict[str, Any] = {"sub": subject, "exp": expire}
-    return jwt.encode(payload, settings.jwt_secret_key, algorithm=settings.algorithm)
+    if tier is not None:
+        payload["tier"] = tier
+    return get_jwt_backend().encode(payload, settings.jwt_secret_key, settings.algorithm)
+
+
+def decode_access_token(token: str) -> dict[str, Any]:
+    claims = token_cache.get(token, time.time())
+    if claims is not None:
+        return claims
+    claims = get_jwt_backend().decode(token, settings.jwt_secret_key, settings.algorithm)
+    token_cache.put(token, claims)
+    return claims
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.redis import get_redis, redis_breaker
+from app.db.session import engine
+from app.messaging.rabbit import publisher
+
+logger = logging.getLogger(__name__)
+
+
+async def ping_database() -> None:
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+def _pool_capacity() -> int | None:
+    size = getattr(engine.pool, "size", None)
+    if not callable(size):
+        return None
+    # QueuePool exposes no public accessor for max_overflow; -1 means unbounded.
+    max_overflow = getattr(engine.pool, "_max_overflow", 0)
+    return None if max_overflow < 0 else size() + max_overflow
+
+
+async def prewarm_database() -> None:
+    connections = settings.db_prewarm_connections
+    capacity = _pool_capacity()
+    if capacity is not None and connections > capacity:
+        logger.warning("DB_PREWARM_CONNECTIONS=%s exceeds the pool capacity, using %s", connections, capacity)
+        connections = capacity
+    if connections <= 0:
+        await ping_database()
+        return
+    barrier = asyncio.Barrier(connections)
+
+    async def checkout() -> None:
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                # Hold every connection until all are open so the pool really grows to the target size.
+                await barrier.wait()
+        except BaseException:
+            await barrier.abort()
+            raise
+
+    await asyncio.gather(*(checkout() for _ in range(connections)))
+
+
+async def prewarm_redis() -> None:
+    await redis_breaker.call(get_redis().ping, timeout=settings.redis_connect_timeout_seconds)
+
+
+async def prewarm_rabbitmq() -> None:
+    await publisher.connect()
+
+
+async def _prewarm(name: str, func: Callable[[], Awaitable[None]]) -> bool:
+    try:
+        await asyncio.wait_for(func(), timeout=settings.startup_prewarm_timeout_seconds)
+    except Exception as exc:
+        logger.warning("Prewarm of %s failed: %s", name, exc)
+        return False
+    return True
+
+
+async def prewarm_dependencies() -> dict[str, bool]:
+    names = ("database", "redis", "rabbitmq")
+    results = await asyncio.gather(
+        _prewarm("database", prewarm_database),
+        _prewarm("redis", prewarm_redis),
+        _prewarm("rabbitmq", prewarm_rabbitmq),
+    )
+    return dict(zip(names, results))
+
+
+async def check_database() -> bool:
+    return await _prewarm("database", ping_database)
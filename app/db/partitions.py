@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import logging
+import re
+from datetime import datetime, timezone
+
+from sqlalchemy import Connection, text
+
+logger = logging.getLogger(__name__)
+
+ORDER_COLUMNS = "id, user_id, items, total_price, status, created_at"
+
+_PARTITION_NAME_RE = re.compile(r"^orders_p(\d{4})(\d{2})$")
+
+DETACH_LOCK_TIMEOUT = "5s"
+
+
+def month_start(value: datetime) -> datetime:
+    value = value.astimezone(timezone.utc)
+    return datetime(value.year, value.month, 1, tzinfo=timezone.utc)
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    index = value.year * 12 + value.month - 1 + months
+    return value.replace(year=index // 12, month=index % 12 + 1)
+
+
+def order_partition_name(month: datetime) -> str:
+    return f"orders_p{month:%Y%m}"
+
+
+def create_order_partition(conn: Connection, month: datetime) -> str:
+    start = month_start(month)
+    end = add_months(start, 1)
+    name = order_partition_name(start)
+    if conn.scalar(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name}):
+        return name
+    bounds = {"start": start, "end": end}
+    partition_sql = (
+        f"CREATE TABLE {name} PARTITION OF orders "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+    has_default = conn.scalar(text("SELECT to_regclass('orders_default') IS NOT NULL"))
+    stranded = has_default and conn.scalar(
+        text("SELECT EXISTS (SELECT 1 FROM orders_default WHERE created_at >= :start AND created_at < :end)"),
+        bounds,
+    )
+    if not stranded:
+        conn.execute(text(partition_sql))
+        return name
+
+    # PostgreSQL refuses to create a partition whose range already has rows in the default
+    # partition (e.g. after beat was down for a while), so move those rows over explicitly.
+    conn.execute(text("ALTER TABLE orders DETACH PARTITION orders_default"))
+    conn.execute(text(partition_sql))
+    moved = conn.execute(
+        text(
+            f"INSERT INTO {name} ({ORDER_COLUMNS}) SELECT {ORDER_COLUMNS} FROM orders_default "
+            "WHERE created_at >= :start AND created_at < :end"
+        ),
+        bounds,
+    ).rowcount
+    conn.execute(text("DELETE FROM orders_default WHERE created_at >= :start AND created_at < :end"), bounds)
+    conn.execute(text("ALTER TABLE orders ATTACH PARTITION orders_default DEFAULT"))
+    logger.info("Moved %s orders from orders_default into %s", moved, name)
+    return name
+
+
+def list_order_partitions(conn: Connection) -> list[str]:
+    rows = conn.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = 'orders'"
+        )
+    )
+    return sorted(row[0] for row in rows)
+
+
+def ensure_order_partitions(conn: Connection, months_ahead: int, now: datetime | None = None) -> list[str]:
+    current = month_start(now or datetime.now(timezone.utc))
+    names: list[str] = []
+    for offset in range(months_ahead + 1):
+        names.append(create_order_partition(conn, add_months(current, offset)))
+        conn.commit()
+    return names
+
+
+def _order_partition_tables(conn: Connection) -> dict[str, bool]:
+    # Includes tables left detached by an interrupted run; the value tells whether it is still attached.
+    rows = conn.execute(
+        text(
+            "SELECT relname, relispartition FROM pg_class "
+            "WHERE relkind = 'r' AND relname ~ '^orders_p[0-9]{6}$' AND pg_table_is_visible(oid)"
+        )
+    )
+    return {row[0]: row[1] for row in rows}
+
+
+def _copy_to_archive(conn: Connection, name: str) -> None:
+    # Idempotent, so it can run again after an interrupted archive; only status changes after creation.
+    conn.execute(
+        text(
+            f"INSERT INTO orders_archive ({ORDER_COLUMNS}) SELECT {ORDER_COLUMNS} FROM {name} "
+            "ON CONFLICT (id, created_at) DO UPDATE SET status = EXCLUDED.status "
+            "WHERE orders_archive.status IS DISTINCT FROM EXCLUDED.status"
+        )
+    )
+
+
+def _detach_order_partition(conn: Connection, name: str) -> None:
+    pending = conn.scalar(
+        text("SELECT inhdetachpending FROM pg_inherits WHERE inhrelid = to_regclass(:name)"), {"name": name}
+    )
+    has_default = conn.scalar(text("SELECT to_regclass('orders_default') IS NOT NULL"))
+    if pending is None:
+        conn.commit()
+        return
+    if pending or not has_default:
+        conn.commit()
+        # DETACH CONCURRENTLY only takes SHARE UPDATE EXCLUSIVE on orders, but it cannot run
+        # inside a transaction block; FINALIZE completes a concurrent detach that was interrupted.
+        suffix = "FINALIZE" if pending else "CONCURRENTLY"
+        with conn.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as ddl:
+            ddl.execute(text(f"ALTER TABLE orders DETACH PARTITION {name} {suffix}"))
+        return
+    # PostgreSQL refuses DETACH CONCURRENTLY while a default partition exists. The plain form is
+    # catalog-only (no scan), so the lock is held briefly; lock_timeout keeps it from queueing traffic.
+    conn.execute(text(f"SET LOCAL lock_timeout = '{DETACH_LOCK_TIMEOUT}'"))
+    conn.execute(text(f"ALTER TABLE orders DETACH PARTITION {name}"))
+    conn.commit()
+
+
+def archive_order_partitions(conn: Connection, retention_months: int, now: datetime | None = None) -> list[str]:
+    cutoff = add_months(month_start(now or datetime.now(timezone.utc)), -retention_months)
+    archived: list[str] = []
+    for name, attached in sorted(_order_partition_tables(conn).items()):
+        match = _PARTITION_NAME_RE.match(name)
+        if match is None:
+            continue
+        month = datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=timezone.utc)
+        if add_months(month, 1) > cutoff:
+            continue
+        if attached:
+            # The bulk copy runs while the partition is attached, so orders is not locked meanwhile.
+            _copy_to_archive(conn, name)
+            conn.commit()
+            _detach_order_partition(conn, name)
+        # The detached table is invisible to orders: pick up changes made since the copy, then drop.
+        _copy_to_archive(conn, name)
+        conn.execute(text(f"DROP TABLE {name}"))
+        conn.commit()
+        logger.info("Archived order partition %s", name)
+        archived.append(name)
+    return archived
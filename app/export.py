@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import enum
+import io
+import json
+import logging
+from collections.abc import AsyncIterator, Iterator, Mapping
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import Connection, Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models.order import Order
+from app.db.session import SessionLocal, engine
+
+logger = logging.getLogger(__name__)
+
+EXPORT_COLUMNS = ("id", "user_id", "items", "total_price", "status", "created_at")
+
+
+class ExportFormat(str, enum.Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+    PARQUET = "parquet"
+
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.PARQUET: "application/vnd.apache.parquet",
+}
+
+
+def _json_row(row: Mapping[str, Any]) -> dict[str, Any]:
+    return {
+        "id": str(row["id"]),
+        "user_id": row["user_id"],
+        "items": row["items"],
+        "total_price": row["total_price"],
+        "status": row["status"].value,
+        "created_at": row["created_at"].isoformat(),
+    }
+
+
+class NdjsonEncoder:
+    def begin(self) -> bytes:
+        return b""
+
+    def encode(self, rows: list[Mapping[str, Any]]) -> bytes:
+        return "".join(json.dumps(_json_row(row)) + "\n" for row in rows).encode("utf-8")
+
+    def finish(self) -> bytes:
+        return b""
+
+
+class CsvEncoder:
+    def __init__(self) -> None:
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+
+    def begin(self) -> bytes:
+        self._writer.writerow(EXPORT_COLUMNS)
+        return self._drain()
+
+    def encode(self, rows: list[Mapping[str, Any]]) -> bytes:
+        for row in rows:
+            record = _json_row(row)
+            record["items"] = json.dumps(record["items"])
+            self._writer.writerow([record[column] for column in EXPORT_COLUMNS])
+        return self._drain()
+
+    def finish(self) -> bytes:
+        return b""
+
+    def _drain(self) -> bytes:
+        data = self._buffer.getvalue().encode("utf-8")
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data
+
+
+class _ByteSink(io.RawIOBase):
+    def __init__(self) -> None:
+        super().__init__()
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ParquetEncoder:
+    def __init__(self) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self._schema = pa.schema(
+            [
+                ("id", pa.string()),
+                ("user_id", pa.int64()),
+                ("items", pa.string()),
+                ("total_price", pa.float64()),
+                ("status", pa.string()),
+                ("created_at", pa.timestamp("us", tz="UTC")),
+            ]
+        )
+        self._sink = _ByteSink()
+        self._writer = pq.ParquetWriter(self._sink, self._schema)
+
+    def begin(self) -> bytes:
+        return self._sink.drain()
+
+    def encode(self, rows: list[Mapping[str, Any]]) -> bytes:
+        batch = self._pa.RecordBatch.from_pylist(
+            [
+                {
+                    "id": str(row["id"]),
+                    "user_id": row["user_id"],
+                    "items": json.dumps(row["items"]),
+                    "total_price": row["total_price"],
+                    "status": row["status"].value,
+                    "created_at": row["created_at"],
+                }
+                for row in rows
+            ],
+            schema=self._schema,
+        )
+        self._writer.write_batch(batch)
+        return self._sink.drain()
+
+    def finish(self) -> bytes:
+        self._writer.close()
+        return self._sink.drain()
+
+
+def make_encoder(fmt: ExportFormat) -> NdjsonEncoder | CsvEncoder | ParquetEncoder:
+    if fmt is ExportFormat.CSV:
+        return CsvEncoder()
+    if fmt is ExportFormat.PARQUET:
+        return ParquetEncoder()
+    return NdjsonEncoder()
+
+
+def export_filename(user_id: int, fmt: ExportFormat) -> str:
+    return f"orders_{user_id}_{datetime.now(timezone.utc):%Y%m%dT%H%M%S}.{fmt.value}"
+
+
+def user_orders_query(user_id: int) -> Select:
+    return (
+        select(*(getattr(Order, column) for column in EXPORT_COLUMNS))
+        .where(Order.user_id == user_id)
+        .order_by(Order.created_at)
+    )
+
+
+def count_user_orders_query(user_id: int) -> Select:
+    return select(func.count()).select_from(Order).where(Order.user_id == user_id)
+
+
+async def stream_user_orders(
+    db: AsyncSession,
+    user_id: int,
+    fmt: ExportFormat,
+    chunk_size: int,
+) -> AsyncIterator[bytes]:
+    encoder = make_encoder(fmt)
+    header = encoder.begin()
+    if header:
+        yield header
+    result = await db.stream(user_orders_query(user_id).execution_options(yield_per=chunk_size))
+    async for rows in result.mappings().partitions(chunk_size):
+        data = encoder.encode(rows)
+        if data:
+            yield data
+    tail = encoder.finish()
+    if tail:
+        yield tail
+
+
+def iter_user_orders(
+    conn: Connection,
+    user_id: int,
+    fmt: ExportFormat,
+    chunk_size: int,
+) -> Iterator[tuple[int, bytes]]:
+    encoder = make_encoder(fmt)
+    yield 0, encoder.begin()
+    result = conn.execute(user_orders_query(user_id).execution_options(yield_per=chunk_size))
+    for rows in result.mappings().partitions(chunk_size):
+        yield len(rows), encoder.encode(rows)
+    yield 0, encoder.finish()
+
+
+async def export_to_file(user_id: int, fmt: ExportFormat, path: str) -> int:
+    written = 0
+    try:
+        async with SessionLocal() as db:
+            with open(path, "wb") as fh:
+                async for data in stream_user_orders(db, user_id, fmt, settings.export_chunk_size):
+                    fh.write(data)
+                    written += len(data)
+    finally:
+        await engine.dispose()
+    return written
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=getattr(logging, settings.log_level.upper(), logging.INFO))
+    parser = argparse.ArgumentParser(description="Export all orders of a user as NDJSON, CSV or Parquet.")
+    parser.add_argument("--user-id", type=int, required=True)
+    parser.add_argument("--format", choices=[fmt.value for fmt in ExportFormat], default=ExportFormat.NDJSON.value)
+    parser.add_argument("--output", help="Output file (defaults to a generated name in EXPORT_DIR for --celery)")
+    parser.add_argument("--celery", action="store_true", help="Run the export as a Celery task")
+    args = parser.parse_args()
+
+    if args.celery:
+        from app.worker.tasks import export_user_orders
+
+        task = export_user_orders.delay(args.user_id, args.format, args.output)
+        print(f"Scheduled export task {task.id}")
+    else:
+        export_format = ExportFormat(args.format)
+        output = args.output or export_filename(args.user_id, export_format)
+        size = asyncio.run(export_to_file(args.user_id, export_format, output))
+        print(f"Exported orders of user {args.user_id} to {output} ({size} bytes)")
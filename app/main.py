@@ -1,14 +1,37 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.router import api_router
+from app.core.cache import cache_writer
 from app.core.config import settings
+from app.core.security import get_jwt_backend
+from app.core.startup import prewarm_dependencies
+from app.messaging.rabbit import publisher
+from app.middleware.compression import CompressionMiddleware
 from app.middleware.rate_limit import RateLimitMiddleware
 
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    app.state.ready = False
+    # Fail the startup instead of every bearer request when the configured backend is unusable.
+    logger.info("JWT backend: %s", get_jwt_backend().name)
+    prewarmed = await prewarm_dependencies()
+    logger.info("Startup prewarm finished: %s", prewarmed)
+    app.state.ready = prewarmed["database"]
+    yield
+    app.state.ready = False
+    await cache_writer.close()
+    await publisher.close()
+
 
 def create_app() -> FastAPI:
     logging.basicConfig(level=getattr(logging, settings.log_level.upper(), logging.INFO))
@@ -18,6 +41,7 @@ def create_app() -> FastAPI:
         docs_url="/docs",
         redoc_url="/redoc",
         openapi_url="/openapi.json",
+        lifespan=lifespan,
     )
 
     if settings.cors_allow_origins:
@@ -30,6 +54,7 @@ def create_app() -> FastAPI:
         )
 
     app.add_middleware(RateLimitMiddleware)
+    app.add_middleware(CompressionMiddleware)
     app.include_router(api_router)
     return app
 
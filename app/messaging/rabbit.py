@@ -7,15 +7,17 @@ from typing import Any
 
 import aio_pika
 
+from app.core.circuit_breaker import CircuitBreaker, register_breaker
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
 
 class RabbitPublisher:
-    def __init__(self, url: str, queue_name: str) -> None:
+    def __init__(self, url: str, queue_name: str, breaker: CircuitBreaker) -> None:
         self._url = url
         self._queue_name = queue_name
+        self._breaker = breaker
         self._connection: aio_pika.RobustConnection | None = None
         self._channel: aio_pika.abc.AbstractRobustChannel | None = None
 
@@ -38,6 +40,7 @@ class RabbitPublisher:
     async def publish_json(self, message: dict[str, Any]) -> None:
         last_exc: Exception | None = None
         for attempt in range(1, 4):
+            self._breaker.before_call()
             try:
                 await self.connect()
                 assert self._channel is not None
@@ -51,8 +54,13 @@ class RabbitPublisher:
                     self._channel.default_exchange.publish(msg, routing_key=self._queue_name),
                     timeout=settings.rabbitmq_publish_timeout_seconds,
                 )
+                self._breaker.record_success()
                 return
+            except asyncio.CancelledError:
+                self._breaker.release_trial()
+                raise
             except Exception as exc:
+                self._breaker.record_failure()
                 last_exc = exc
                 logger.warning("RabbitMQ publish failed (attempt=%s): %s", attempt, exc)
                 await self.close()
@@ -61,4 +69,16 @@ class RabbitPublisher:
         raise last_exc
 
 
-publisher = RabbitPublisher(url=settings.rabbitmq_url, queue_name=settings.rabbitmq_queue_new_order)
+rabbitmq_breaker = register_breaker(
+    CircuitBreaker(
+        name="rabbitmq",
+        failure_threshold=settings.rabbitmq_breaker_failure_threshold,
+        reset_timeout_seconds=settings.rabbitmq_breaker_reset_seconds,
+    )
+)
+
+publisher = RabbitPublisher(
+    url=settings.rabbitmq_url,
+    queue_name=settings.rabbitmq_queue_new_order,
+    breaker=rabbitmq_breaker,
+)
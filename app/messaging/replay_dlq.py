@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+
+import aio_pika
+from aio_pika.abc import AbstractIncomingMessage
+
+from app.core.config import settings
+from app.messaging.topology import (
+    DEAD_LETTER_REASON_HEADER,
+    RETRY_COUNT_HEADER,
+    dead_letter_queue_name,
+    declare_new_order_topology,
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def replay(limit: int | None, dry_run: bool) -> int:
+    queue_name = settings.rabbitmq_queue_new_order
+    connection = await aio_pika.connect_robust(settings.rabbitmq_url)
+    replayed = 0
+    async with connection:
+        channel = await connection.channel()
+        await declare_new_order_topology(channel)
+        dlq = await channel.declare_queue(dead_letter_queue_name(queue_name), passive=True)
+        # Only the messages present at start are handled: requeued (dry run) or re-dead-lettered
+        # messages land back in the DLQ and would otherwise be picked up forever.
+        depth = dlq.declaration_result.message_count
+        budget = depth if limit is None else min(limit, depth)
+        held: list[AbstractIncomingMessage] = []
+        try:
+            while replayed < budget:
+                message = await dlq.get(no_ack=False, fail=False)
+                if message is None:
+                    break
+                headers = dict(message.headers or {})
+                reason = headers.pop(DEAD_LETTER_REASON_HEADER, None)
+                headers.pop(RETRY_COUNT_HEADER, None)
+                if dry_run:
+                    print(f"{message.message_id or '-'} reason={reason} body={message.body[:200]!r}")
+                    held.append(message)
+                else:
+                    await channel.default_exchange.publish(
+                        aio_pika.Message(
+                            body=message.body,
+                            headers=headers,
+                            content_type=message.content_type,
+                            delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+                        ),
+                        routing_key=queue_name,
+                    )
+                    await message.ack()
+                replayed += 1
+        finally:
+            for message in held:
+                await message.nack(requeue=True)
+    return replayed
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=getattr(logging, settings.log_level.upper(), logging.INFO))
+    parser = argparse.ArgumentParser(
+        description="Move messages from the new_order dead-letter queue back to new_order."
+    )
+    parser.add_argument("--limit", type=int, default=None, help="Maximum number of messages to replay")
+    parser.add_argument("--dry-run", action="store_true", help="Print dead-lettered messages without moving them")
+    args = parser.parse_args()
+    count = asyncio.run(replay(args.limit, args.dry_run))
+    print(f"{'Inspected' if args.dry_run else 'Replayed'} {count} messages")
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import logging
+
+import aio_pika
+from aio_pika.abc import AbstractChannel, AbstractIncomingMessage, AbstractQueue
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+RETRY_COUNT_HEADER = "x-retry-count"
+DEAD_LETTER_REASON_HEADER = "x-dead-letter-reason"
+
+
+def dead_letter_queue_name(queue_name: str) -> str:
+    return f"{queue_name}.dlq"
+
+
+def retry_queue_name(queue_name: str, delay_ms: int) -> str:
+    return f"{queue_name}.retry.{delay_ms}ms"
+
+
+async def declare_new_order_topology(channel: AbstractChannel) -> AbstractQueue:
+    queue_name = settings.rabbitmq_queue_new_order
+    queue = await channel.declare_queue(queue_name, durable=True)
+    await channel.declare_queue(dead_letter_queue_name(queue_name), durable=True)
+    for delay_ms in settings.rabbitmq_retry_delays_ms:
+        # Expired messages are dead-lettered back to the main queue through the default exchange.
+        await channel.declare_queue(
+            retry_queue_name(queue_name, delay_ms),
+            durable=True,
+            arguments={
+                "x-message-ttl": delay_ms,
+                "x-dead-letter-exchange": "",
+                "x-dead-letter-routing-key": queue_name,
+            },
+        )
+    return queue
+
+
+async def _republish(
+    channel: AbstractChannel,
+    message: AbstractIncomingMessage,
+    routing_key: str,
+    headers: dict,
+) -> None:
+    await channel.default_exchange.publish(
+        aio_pika.Message(
+            body=message.body,
+            headers=headers,
+            content_type=message.content_type,
+            delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+        ),
+        routing_key=routing_key,
+    )
+
+
+async def dead_letter(channel: AbstractChannel, message: AbstractIncomingMessage, reason: str) -> None:
+    headers = dict(message.headers or {})
+    headers[DEAD_LETTER_REASON_HEADER] = reason
+    await _republish(channel, message, dead_letter_queue_name(settings.rabbitmq_queue_new_order), headers)
+    logger.warning("Dead-lettered message (reason=%s)", reason)
+
+
+async def retry_later(channel: AbstractChannel, message: AbstractIncomingMessage, reason: str) -> None:
+    headers = dict(message.headers or {})
+    retries = int(headers.get(RETRY_COUNT_HEADER, 0))
+    if retries >= settings.rabbitmq_max_retries:
+        await dead_letter(channel, message, f"max retries exceeded: {reason}")
+        return
+    delays = settings.rabbitmq_retry_delays_ms
+    delay_ms = delays[min(retries, len(delays) - 1)]
+    headers[RETRY_COUNT_HEADER] = retries + 1
+    await _republish(channel, message, retry_queue_name(settings.rabbitmq_queue_new_order, delay_ms), headers)
+    logger.info("Scheduled retry %s in %sms (reason=%s)", retries + 1, delay_ms, reason)
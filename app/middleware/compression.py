@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import zlib
+from collections.abc import Callable
+from typing import Protocol
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import compression_stats
+
+# Already compressed or latency sensitive bodies are sent as is.
+SKIP_CONTENT_TYPES = (
+    "text/event-stream",
+    "application/vnd.apache.parquet",
+    "application/gzip",
+    "application/zip",
+    "image/",
+    "video/",
+    "audio/",
+)
+
+
+class _Compressor(Protocol):
+    def compress(self, data: bytes) -> bytes: ...
+
+    def flush(self) -> bytes: ...
+
+    def finish(self) -> bytes: ...
+
+
+class GzipCompressor:
+    def __init__(self, level: int) -> None:
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+class BrotliCompressor:
+    def __init__(self, quality: int) -> None:
+        import brotli
+
+        self._obj = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.process(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush()
+
+    def finish(self) -> bytes:
+        return self._obj.finish()
+
+
+def _brotli_available() -> bool:
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _accepted_encodings(header: str) -> set[str]:
+    accepted: set[str] = set()
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name)
+    return accepted
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.minimum_size = settings.compression_minimum_size
+        self.gzip_level = settings.compression_gzip_level
+        self.brotli_quality = settings.compression_brotli_quality
+        self.brotli = settings.compression_brotli_enabled and _brotli_available()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = self._choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressionResponder(send, encoding, self._make_compressor, self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+    def _choose_encoding(self, header: str) -> str | None:
+        accepted = _accepted_encodings(header)
+        if self.brotli and "br" in accepted:
+            return "br"
+        if "gzip" in accepted or "*" in accepted:
+            return "gzip"
+        return None
+
+    def _make_compressor(self, encoding: str) -> _Compressor:
+        if encoding == "br":
+            return BrotliCompressor(self.brotli_quality)
+        return GzipCompressor(self.gzip_level)
+
+
+class _CompressionResponder:
+    def __init__(
+        self,
+        send: Send,
+        encoding: str,
+        make_compressor: Callable[[str], _Compressor],
+        minimum_size: int,
+    ) -> None:
+        self._send = send
+        self._encoding = encoding
+        self._make_compressor = make_compressor
+        self._minimum_size = minimum_size
+        self._start: Message | None = None
+        self._compressor: _Compressor | None = None
+        self._passthrough = False
+        self._buffer: list[bytes] = []
+        self._buffered = 0
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self._start = message
+            return
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self._passthrough:
+            compression_stats.record_skipped(len(body))
+            await self._send(message)
+            return
+        if self._compressor is not None:
+            await self._send_compressed(body, more_body)
+            return
+
+        assert self._start is not None
+        headers = MutableHeaders(scope=self._start)
+        if "content-encoding" in headers or headers.get("content-type", "").lower().startswith(SKIP_CONTENT_TYPES):
+            await self._skip(message)
+            return
+        # Streamed bodies (including everything behind BaseHTTPMiddleware) are buffered
+        # until they reach minimum_size, so small responses stay uncompressed.
+        self._buffer.append(body)
+        self._buffered += len(body)
+        if more_body and self._buffered < self._minimum_size:
+            return
+        buffered = b"".join(self._buffer)
+        self._buffer.clear()
+        if not more_body and len(buffered) < self._minimum_size:
+            await self._skip({"type": "http.response.body", "body": buffered})
+            return
+
+        self._compressor = self._make_compressor(self._encoding)
+        headers["Content-Encoding"] = self._encoding
+        headers.add_vary_header("Accept-Encoding")
+        compression_stats.record_response(self._encoding)
+        if more_body:
+            del headers["Content-Length"]
+            await self._send(self._start)
+            await self._send_compressed(buffered, more_body=True)
+            return
+        data = self._compressor.compress(buffered) + self._compressor.finish()
+        headers["Content-Length"] = str(len(data))
+        compression_stats.record(self._encoding, len(buffered), len(data))
+        await self._send(self._start)
+        await self._send({"type": "http.response.body", "body": data})
+
+    async def _skip(self, message: Message) -> None:
+        assert self._start is not None
+        self._passthrough = True
+        compression_stats.record_response(None)
+        compression_stats.record_skipped(len(message.get("body", b"")))
+        await self._send(self._start)
+        await self._send(message)
+
+    async def _send_compressed(self, body: bytes, more_body: bool) -> None:
+        assert self._compressor is not None
+        data = self._compressor.compress(body)
+        data += self._compressor.flush() if more_body else self._compressor.finish()
+        compression_stats.record(self._encoding, len(body), len(data))
+        await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
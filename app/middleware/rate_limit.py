@@ -8,67 +8,164 @@ from dataclasses import dataclass
 from fastapi import Request
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import JSONResponse, Response
+from starlette.routing import BaseRoute, Match
+from starlette.types import Scope
 
 from app.core.config import settings
-from app.core.redis import get_redis
+from app.core.redis import get_rate_limit_redis, rate_limit_redis_breaker
+from app.core.security import TokenError, decode_access_token
 
 logger = logging.getLogger(__name__)
 
+EXEMPT_PATHS = {"/docs", "/redoc", "/openapi.json", "/metrics", "/health/live", "/health/ready"}
+
+# All requests that match no route share one bucket, so scanning random paths cannot grow the key space.
+UNMATCHED_ROUTE = "<unmatched>"
+
 
 @dataclass
-class _Counter:
-    count: int
-    reset_at: float
+class _Budget:
+    window: int
+    remote_count: int = 0
+    pending: int = 0
+
+
+def _included_router(route: BaseRoute) -> tuple[list[BaseRoute], str] | None:
+    # FastAPI up to the 0.13x line copies included routes into app.router.routes with their
+    # full path, so this is never reached there. Later releases (checked on 0.143) keep each
+    # include_router() call as a lazy node without a path that exposes the child router as
+    # `original_router` and its prefix as `include_context.prefix`. Anything else without a
+    # path is skipped and the rate limit key falls back to the raw URL path.
+    router = getattr(route, "original_router", None)
+    child_routes = getattr(router, "routes", None)
+    if not isinstance(child_routes, list):
+        return None
+    prefix = getattr(getattr(route, "include_context", None), "prefix", "") or ""
+    return child_routes, prefix
 
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
     def __init__(self, app) -> None:
         super().__init__(app)
-        self._mem: dict[str, _Counter] = {}
+        self._budgets: dict[str, _Budget] = {}
+        self._tiers = settings.rate_limit_tiers
+        self._sync_task: asyncio.Task[None] | None = None
 
     async def dispatch(self, request: Request, call_next) -> Response:
-        path = request.url.path
-        if path in {"/docs", "/redoc", "/openapi.json"}:
+        if request.url.path in EXEMPT_PATHS:
             return await call_next(request)
 
-        client = request.client.host if request.client else "unknown"
-        key = f"rl:{client}:{path}"
-        now = time.time()
+        identity, tier = self._identify(request)
+        key = f"rl:{identity}:{request.method}:{self._route_template(request)}"
+        limit = self._tiers.get(tier, self._tiers["user"])
+        window = int(time.time() // settings.rate_limit_seconds)
 
-        redis_decision = await self._allow_redis(key)
-        if redis_decision is True:
-            return await call_next(request)
-        if redis_decision is False:
+        allowed = self._allow(key, window, limit)
+        self._ensure_sync_task()
+        if not allowed:
             return JSONResponse(status_code=429, content={"detail": "Rate limit exceeded"})
+        return await call_next(request)
 
-        if self._allow_memory(key, now):
-            return await call_next(request)
+    def _identify(self, request: Request) -> tuple[str, str]:
+        authorization = request.headers.get("authorization", "")
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() == "bearer" and token:
+            try:
+                claims = decode_access_token(token)
+            except TokenError:
+                claims = {}
+            subject = claims.get("sub")
+            if subject is not None:
+                return f"user:{subject}", str(claims.get("tier", "user"))
+        return f"ip:{self._client_ip(request)}", "anonymous"
+
+    def _client_ip(self, request: Request) -> str:
+        trusted_proxies = settings.rate_limit_trusted_proxy_count
+        forwarded_for = request.headers.get("x-forwarded-for")
+        if trusted_proxies > 0 and forwarded_for:
+            hops = [hop.strip() for hop in forwarded_for.split(",") if hop.strip()]
+            if hops:
+                return hops[-min(trusted_proxies, len(hops))]
+        return request.client.host if request.client else "unknown"
+
+    def _route_template(self, request: Request) -> str:
+        full, partial = self._match_routes(request.app.router.routes, request.scope, "")
+        return full or partial or UNMATCHED_ROUTE
 
-        return JSONResponse(
-            status_code=429,
-            content={"detail": "Rate limit exceeded"},
-        )
+    def _match_routes(
+        self,
+        routes: list[BaseRoute],
+        scope: Scope,
+        prefix: str,
+    ) -> tuple[str | None, str | None]:
+        partial: str | None = None
+        for route in routes:
+            path = getattr(route, "path", None)
+            if path is None:
+                included = _included_router(route)
+                if included is None:
+                    continue
+                child_routes, include_prefix = included
+                child_scope = scope
+                if include_prefix:
+                    if not scope["path"].startswith(include_prefix):
+                        continue
+                    child_scope = {**scope, "path": scope["path"][len(include_prefix) :]}
+                full, child_partial = self._match_routes(child_routes, child_scope, prefix + include_prefix)
+                if full is not None:
+                    return full, None
+                partial = partial or child_partial
+                continue
+            match, _ = route.matches(scope)
+            if match is Match.FULL:
+                return prefix + path, None
+            if match is Match.PARTIAL and partial is None:
+                partial = prefix + path
+        return None, partial
 
-    async def _allow_redis(self, key: str) -> bool | None:
+    def _allow(self, key: str, window: int, limit: int) -> bool:
+        budget = self._budgets.get(key)
+        if budget is None or budget.window != window:
+            budget = _Budget(window=window)
+            self._budgets[key] = budget
+        if budget.remote_count + budget.pending >= limit:
+            return False
+        budget.pending += 1
+        return True
+
+    def _ensure_sync_task(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._sync_task is not None and not self._sync_task.done() and self._sync_task.get_loop() is loop:
+            return
+        self._sync_task = loop.create_task(self._sync_loop())
+
+    async def _sync_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.rate_limit_sync_interval_seconds)
+            await self._sync()
+
+    async def _sync(self) -> None:
+        current_window = int(time.time() // settings.rate_limit_seconds)
+        for key in [key for key, budget in self._budgets.items() if budget.window < current_window]:
+            del self._budgets[key]
+
+        batch = [(key, budget, budget.pending) for key, budget in self._budgets.items() if budget.pending]
+        if not batch:
+            return
         try:
-            redis = get_redis()
-            count = await asyncio.wait_for(redis.incr(key), timeout=settings.redis_socket_timeout_seconds)
-            if count == 1:
-                await asyncio.wait_for(
-                    redis.expire(key, settings.rate_limit_seconds),
+            redis = get_rate_limit_redis()
+            async with redis.pipeline(transaction=False) as pipe:
+                for key, budget, sent in batch:
+                    remote_key = f"{key}:{budget.window}"
+                    pipe.incrby(remote_key, sent)
+                    pipe.expire(remote_key, settings.rate_limit_seconds * 2)
+                results = await rate_limit_redis_breaker.call(
+                    pipe.execute,
                     timeout=settings.redis_socket_timeout_seconds,
                 )
-            return count <= settings.rate_limit_times
         except Exception as exc:
-            logger.debug("Rate limiter redis unavailable, falling back to memory: %s", exc)
-            return None
-
-    def _allow_memory(self, key: str, now: float) -> bool:
-        counter = self._mem.get(key)
-        if counter is None or now >= counter.reset_at:
-            self._mem[key] = _Counter(count=1, reset_at=now + settings.rate_limit_seconds)
-            return True
-        if counter.count >= settings.rate_limit_times:
-            return False
-        counter.count += 1
-        return True
+            logger.debug("Rate limiter sync failed, keeping local counts: %s", exc)
+            return
+        for (_key, budget, sent), total in zip(batch, results[::2]):
+            budget.pending -= sent
+            budget.remote_count = int(total)
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+
+from sqlalchemy import select
+
+from app.core.cache import cache_set_orders
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.db.models.order import Order
+from app.db.session import SessionLocal, engine
+from app.schemas.order import OrderPublic
+
+logger = logging.getLogger(__name__)
+
+WARMUP_CHUNK_SIZE = 500
+
+
+async def warm_order_cache(limit: int) -> int:
+    redis = get_redis()
+    warmed = 0
+    async with SessionLocal() as db:
+        orders = (await db.scalars(select(Order).order_by(Order.created_at.desc()).limit(limit))).all()
+    for start in range(0, len(orders), WARMUP_CHUNK_SIZE):
+        chunk = orders[start : start + WARMUP_CHUNK_SIZE]
+        await cache_set_orders(
+            redis,
+            {
+                order.id: OrderPublic.model_validate(order, from_attributes=True).model_dump(mode="json")
+                for order in chunk
+            },
+        )
+        warmed += len(chunk)
+    return warmed
+
+
+async def main(limit: int) -> None:
+    try:
+        warmed = await warm_order_cache(limit)
+        logger.info("Warmed order cache with %s orders", warmed)
+    except Exception as exc:
+        logger.warning("Order cache warm-up failed: %s", exc)
+    finally:
+        await get_redis().aclose()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=getattr(logging, settings.log_level.upper(), logging.INFO))
+    parser = argparse.ArgumentParser(description="Preload recently created orders into the Redis cache.")
+    parser.add_argument("--limit", type=int, default=settings.cache_warmup_limit)
+    args = parser.parse_args()
+    asyncio.run(main(args.limit))
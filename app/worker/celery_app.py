@@ -1,12 +1,46 @@
 from __future__ import annotations
 
 from celery import Celery
+from celery.schedules import crontab
 
 from app.core.config import settings
 
+ORDERS_QUEUE = "orders"
+HEAVY_QUEUE = "heavy"
+MAINTENANCE_QUEUE = "maintenance"
+
+# Redis broker: lower number = served first.
+PRIORITY_DEFAULT = 5
+PRIORITY_LOW = 9
+
 celery_app = Celery(
     "orders_worker",
     broker=settings.celery_broker_url,
     backend=settings.celery_result_backend,
     include=["app.worker.tasks"],
 )
+celery_app.conf.update(
+    task_ignore_result=True,
+    result_expires=settings.celery_result_expires_seconds,
+    task_default_queue=ORDERS_QUEUE,
+    task_default_priority=PRIORITY_DEFAULT,
+    task_routes={
+        "process_order": {"queue": ORDERS_QUEUE},
+        "process_orders_batch": {"queue": ORDERS_QUEUE},
+        "update_orders_status": {"queue": ORDERS_QUEUE},
+        "export_user_orders": {"queue": HEAVY_QUEUE},
+        "maintain_order_partitions": {"queue": MAINTENANCE_QUEUE},
+    },
+    broker_transport_options={
+        "priority_steps": list(range(PRIORITY_LOW + 1)),
+        "sep": ":",
+        "queue_order_strategy": "priority",
+    },
+    worker_prefetch_multiplier=1,
+)
+celery_app.conf.beat_schedule = {
+    "maintain-order-partitions": {
+        "task": "maintain_order_partitions",
+        "schedule": crontab(hour=3, minute=0),
+    },
+}
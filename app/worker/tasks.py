@@ -1,14 +1,165 @@
 from __future__ import annotations
 
+import json
+import logging
+import os
 import time
 import uuid
+from typing import Any
 
-from app.worker.celery_app import celery_app
+from sqlalchemy import Uuid, any_, bindparam, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import OperationalError
 
+from app.core.cache import order_cache_key
+from app.core.config import settings
+from app.core.events import order_status_event
+from app.core.redis import get_sync_redis
+from app.db.models.order import Order, OrderStatus
+from app.db.partitions import archive_order_partitions, ensure_order_partitions
+from app.db.session import get_sync_engine
+from app.export import ExportFormat, count_user_orders_query, export_filename, iter_user_orders
+from app.worker.celery_app import PRIORITY_LOW, celery_app
 
-@celery_app.task(name="process_order")
-def process_order(order_id: str) -> None:
+logger = logging.getLogger(__name__)
+
+
+def handle_order(order_id: uuid.UUID) -> None:
     time.sleep(2)
-    _ = uuid.UUID(order_id)
     print(f"Order {order_id} processed")
 
+
+@celery_app.task(name="process_order", ignore_result=True)
+def process_order(order_id: str, status: str | None = None) -> None:
+    parsed_id = uuid.UUID(order_id)
+    handle_order(parsed_id)
+    if status is not None:
+        _apply_status([parsed_id], OrderStatus(status))
+
+
+@celery_app.task(name="process_orders_batch", ignore_result=True)
+def process_orders_batch(
+    order_ids: list[str],
+    status: str | None = None,
+    attempt: int = 1,
+) -> dict[str, Any]:
+    processed: list[uuid.UUID] = []
+    failed: list[str] = []
+    for raw_id in order_ids:
+        try:
+            order_id = uuid.UUID(raw_id)
+        except (TypeError, ValueError, AttributeError):
+            logger.warning("Dropping invalid order id %r from batch", raw_id)
+            continue
+        try:
+            handle_order(order_id)
+        except Exception as exc:
+            logger.warning("Processing of order %s failed: %s", order_id, exc)
+            failed.append(str(order_id))
+            continue
+        processed.append(order_id)
+
+    if processed and status is not None:
+        _apply_status(processed, OrderStatus(status))
+
+    if failed:
+        if attempt < settings.order_batch_max_attempts:
+            process_orders_batch.apply_async(
+                (failed, status, attempt + 1),
+                countdown=settings.order_batch_retry_delay_seconds * attempt,
+                priority=PRIORITY_LOW,
+            )
+        else:
+            logger.error("Giving up on orders after %s attempts: %s", attempt, failed)
+
+    return {"processed": len(processed), "failed": failed}
+
+
+@celery_app.task(
+    name="update_orders_status",
+    bind=True,
+    ignore_result=True,
+    max_retries=settings.order_batch_max_attempts,
+)
+def update_orders_status(self, order_ids: list[str], status: str) -> None:
+    target_status = OrderStatus(status)
+    try:
+        updated = _bulk_update_status([uuid.UUID(order_id) for order_id in order_ids], target_status)
+    except OperationalError as exc:
+        raise self.retry(exc=exc, countdown=settings.order_batch_retry_delay_seconds)
+    _publish_status_changes(updated, target_status)
+
+
+def _apply_status(order_ids: list[uuid.UUID], status: OrderStatus) -> None:
+    # Orders are already processed at this point; a failed UPDATE is retried on its own
+    # so the processing step never runs twice for them.
+    try:
+        updated = _bulk_update_status(order_ids, status)
+    except OperationalError as exc:
+        logger.warning("Bulk status update of %s orders failed, retrying later: %s", len(order_ids), exc)
+        update_orders_status.apply_async(
+            ([str(order_id) for order_id in order_ids], status.value),
+            countdown=settings.order_batch_retry_delay_seconds,
+            priority=PRIORITY_LOW,
+        )
+        return
+    _publish_status_changes(updated, status)
+
+
+def _bulk_update_status(order_ids: list[uuid.UUID], status: OrderStatus) -> list[tuple[uuid.UUID, int]]:
+    engine = get_sync_engine()
+    if engine.dialect.name == "postgresql":
+        id_filter = Order.id == any_(bindparam("ids", order_ids, type_=postgresql.ARRAY(Uuid)))
+    else:
+        id_filter = Order.id.in_(order_ids)
+    stmt = (
+        update(Order)
+        .where(id_filter, Order.status == OrderStatus.PENDING)
+        .values(status=status)
+        .returning(Order.id, Order.user_id)
+    )
+    with engine.begin() as conn:
+        return [(row.id, row.user_id) for row in conn.execute(stmt)]
+
+
+def _publish_status_changes(updated: list[tuple[uuid.UUID, int]], status: OrderStatus) -> None:
+    if not updated:
+        return
+    try:
+        with get_sync_redis().pipeline(transaction=False) as pipe:
+            for order_id, user_id in updated:
+                pipe.delete(order_cache_key(order_id))
+                event = order_status_event({"id": order_id, "user_id": user_id, "status": status.value})
+                pipe.publish(settings.order_events_channel, json.dumps(event))
+            pipe.execute()
+    except Exception as exc:
+        logger.warning("Failed to invalidate cache / publish events for %s orders: %s", len(updated), exc)
+
+
+@celery_app.task(name="maintain_order_partitions", ignore_result=True)
+def maintain_order_partitions() -> None:
+    engine = get_sync_engine()
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.connect() as conn:
+        created = ensure_order_partitions(conn, settings.orders_partition_months_ahead)
+        archived = archive_order_partitions(conn, settings.orders_retention_months)
+    logger.info("Order partitions ensured: %s; archived: %s", created, archived)
+
+
+@celery_app.task(name="export_user_orders", bind=True, ignore_result=False)
+def export_user_orders(self, user_id: int, fmt: str = "ndjson", output_path: str | None = None) -> dict[str, Any]:
+    export_format = ExportFormat(fmt)
+    if output_path is None:
+        os.makedirs(settings.export_dir, exist_ok=True)
+        output_path = os.path.join(settings.export_dir, export_filename(user_id, export_format))
+    exported = 0
+    with get_sync_engine().connect() as conn:
+        total = conn.scalar(count_user_orders_query(user_id)) or 0
+        with open(output_path, "wb") as fh:
+            for rows, data in iter_user_orders(conn, user_id, export_format, settings.export_chunk_size):
+                fh.write(data)
+                if rows:
+                    exported += rows
+                    self.update_state(state="PROGRESS", meta={"exported": exported, "total": total})
+    return {"path": output_path, "exported": exported}
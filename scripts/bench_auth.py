@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import argparse
+import sys
+import timeit
+from datetime import timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.config import settings  # noqa: E402
+from app.core.security import (  # noqa: E402
+    JoseBackend,
+    PyJWTBackend,
+    create_access_token,
+    decode_access_token,
+    token_cache,
+)
+
+
+def _report(label: str, seconds: float, number: int) -> None:
+    print(f"{label:<28} {seconds / number * 1_000_000:8.2f} us/request")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure JWT verification overhead per request.")
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    token = create_access_token(subject="1", expires_delta=timedelta(minutes=30))
+    key = settings.jwt_secret_key
+
+    backends = [JoseBackend()]
+    try:
+        backends.append(PyJWTBackend())
+    except ImportError:
+        print("PyJWT is not installed, skipping the pyjwt backend")
+
+    for backend in backends:
+        seconds = timeit.timeit(lambda: backend.decode(token, key, settings.algorithm), number=args.number)
+        _report(f"decode ({backend.name})", seconds, args.number)
+
+    token_cache.clear()
+    decode_access_token(token)
+    seconds = timeit.timeit(lambda: decode_access_token(token), number=args.number)
+    _report("decode_access_token (cached)", seconds, args.number)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _get(url: str) -> int:
+    try:
+        with urllib.request.urlopen(url, timeout=10) as resp:
+            return resp.status
+    except Exception as exc:
+        if hasattr(exc, "code"):
+            return exc.code
+        raise
+
+
+def _wait_ready(base_url: str, timeout_s: float) -> None:
+    deadline = time.perf_counter() + timeout_s
+    while time.perf_counter() < deadline:
+        try:
+            if _get(f"{base_url}/health/ready") == 200:
+                return
+        except Exception:
+            pass
+        time.sleep(0.01)
+    raise RuntimeError(f"Service did not become ready at {base_url}")
+
+
+def run_once(path: str, timeout_s: float) -> tuple[float, float]:
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=ROOT,
+        env=os.environ.copy(),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        _wait_ready(base_url, timeout_s)
+        ready_at = time.perf_counter()
+        request_started = time.perf_counter()
+        _get(f"{base_url}{path}")
+        first_request = time.perf_counter() - request_started
+        return ready_at - started, first_request
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure cold start to first request latency of the API.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--path", default="/docs", help="Path requested right after the service becomes ready")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    ready_times: list[float] = []
+    first_times: list[float] = []
+    for run in range(1, args.runs + 1):
+        ready_s, first_s = run_once(args.path, args.timeout)
+        ready_times.append(ready_s)
+        first_times.append(first_s)
+        print(f"run={run} start_to_ready={ready_s * 1000:.1f}ms first_request={first_s * 1000:.1f}ms")
+
+    print(
+        f"median start_to_ready={statistics.median(ready_times) * 1000:.1f}ms "
+        f"first_request={statistics.median(first_times) * 1000:.1f}ms"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import asyncio
+import uuid
+
+from app.core.cache import CacheWriter, order_cache_key
+
+
+class _FakePipeline:
+    def __init__(self, redis: _FakeRedis) -> None:
+        self._redis = redis
+        self._ops: list[tuple[str, str | None]] = []
+
+    async def __aenter__(self) -> _FakePipeline:
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        return None
+
+    def set(self, key: str, value: str, ex: int | None = None) -> None:
+        self._ops.append((key, value))
+
+    def delete(self, key: str) -> None:
+        self._ops.append((key, None))
+
+    def publish(self, channel: str, message: str) -> None:
+        self._ops.append((f"publish:{channel}", message))
+
+    async def execute(self) -> list[bool]:
+        self._redis.pipeline_calls.append(len(self._ops))
+        if self._redis.fail:
+            raise ConnectionError("redis is down")
+        for key, value in self._ops:
+            if key.startswith("publish:"):
+                self._redis.published.append(value)
+            elif value is None:
+                self._redis.store.pop(key, None)
+            else:
+                self._redis.store[key] = value
+        return [True] * len(self._ops)
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.store: dict[str, str] = {}
+        self.pipeline_calls: list[int] = []
+        self.fail = False
+        self.published: list[str] = []
+
+    def pipeline(self, transaction: bool = True) -> _FakePipeline:
+        return _FakePipeline(self)
+
+
+def test_cache_writer_coalesces_and_drops_on_overflow() -> None:
+    redis = _FakeRedis()
+    writer = CacheWriter(redis_factory=lambda: redis, max_pending=2, flush_delay_seconds=0.01)
+    first, second, third = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+
+    async def scenario() -> None:
+        assert writer.enqueue(first, {"status": "PENDING"})
+        assert writer.enqueue(first, {"status": "PAID"})
+        assert writer.enqueue(second, {"status": "PENDING"})
+        assert not writer.enqueue(third, {"status": "PENDING"})
+        await asyncio.sleep(0.05)
+        await writer.close()
+
+    asyncio.run(scenario())
+
+    assert redis.pipeline_calls == [2]
+    assert '"PAID"' in redis.store[order_cache_key(first)]
+    assert order_cache_key(third) not in redis.store
+    assert writer.dropped == 1
+
+
+def test_cache_writer_invalidation_bypasses_bound_and_survives_failures() -> None:
+    redis = _FakeRedis()
+    writer = CacheWriter(
+        redis_factory=lambda: redis, max_pending=1, flush_delay_seconds=0.01, retry_delay_seconds=0.01
+    )
+    filled, updated = uuid.uuid4(), uuid.uuid4()
+    redis.store[order_cache_key(updated)] = '{"status": "PENDING"}'
+
+    async def scenario() -> None:
+        redis.fail = True
+        assert writer.enqueue(filled, {"status": "PENDING"})
+        writer.invalidate(updated)
+        assert not writer.enqueue(updated, {"status": "PENDING"})
+        await asyncio.sleep(0.05)
+        assert order_cache_key(updated) in redis.store
+        redis.fail = False
+        await asyncio.sleep(0.05)
+        await writer.close()
+
+    asyncio.run(scenario())
+
+    assert order_cache_key(updated) not in redis.store
+    assert order_cache_key(filled) not in redis.store
+    assert writer.dropped == 1
+
+
+def test_cache_writer_publishes_events_after_key_updates() -> None:
+    redis = _FakeRedis()
+    writer = CacheWriter(redis_factory=lambda: redis, max_pending=1, flush_delay_seconds=0.01)
+    order_id = uuid.uuid4()
+    order_key = order_cache_key(order_id)
+    redis.store[order_key] = '{"status": "PENDING"}'
+
+    async def scenario() -> None:
+        writer.invalidate(order_id)
+        assert writer.publish({"type": "order_status", "status": "PAID"})
+        assert not writer.publish({"type": "order_status", "status": "SHIPPED"})
+        await writer.close()
+
+    asyncio.run(scenario())
+
+    assert order_key not in redis.store
+    assert redis.published == ['{"type": "order_status", "status": "PAID"}']
+    assert writer.events_dropped == 1
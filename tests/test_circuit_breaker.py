@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import pytest
+
+from app.core.circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitState, breakers
+
+
+def test_circuit_breaker_opens_and_recovers_after_cooldown() -> None:
+    now = [0.0]
+    breaker = CircuitBreaker(name="test", failure_threshold=2, reset_timeout_seconds=5.0, clock=lambda: now[0])
+
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state is CircuitState.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    now[0] = 5.0
+    breaker.before_call()
+    assert breaker.state is CircuitState.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state is CircuitState.CLOSED
+    assert breaker.rejections_total == 2
+    assert "test" not in breakers
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import gzip
+
+import pytest
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.metrics import compression_stats
+from app.middleware.compression import CompressionMiddleware
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+
+    @app.get("/small")
+    async def small() -> PlainTextResponse:
+        return PlainTextResponse("ok")
+
+    @app.get("/large")
+    async def large() -> PlainTextResponse:
+        return PlainTextResponse("order," * 2000)
+
+    @app.get("/stream")
+    async def stream() -> StreamingResponse:
+        async def chunks():
+            for index in range(5):
+                yield f'{{"row": {index}}}\n'.encode() * 200
+
+        return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+    @app.get("/small-stream")
+    async def small_stream() -> StreamingResponse:
+        async def chunks():
+            yield b"[]"
+
+        return StreamingResponse(chunks(), media_type="application/json")
+
+    app.add_middleware(CompressionMiddleware)
+    return TestClient(app)
+
+
+def test_compresses_large_and_streaming_responses(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "compression_brotli_enabled", False)
+    client = _client()
+    headers = {"Accept-Encoding": "gzip"}
+    before = compression_stats.input_bytes["gzip"]
+
+    small = client.get("/small", headers=headers)
+    assert "content-encoding" not in small.headers
+    assert small.text == "ok"
+    assert "content-encoding" not in client.get("/small-stream", headers=headers).headers
+
+    large = client.get("/large", headers=headers)
+    assert large.headers["content-encoding"] == "gzip"
+    assert int(large.headers["content-length"]) < 12000
+    assert large.text == "order," * 2000
+
+    with client.stream("GET", "/stream", headers=headers) as response:
+        raw = b"".join(response.iter_raw())
+    assert response.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(raw).count(b"\n") == 1000
+    assert compression_stats.input_bytes["gzip"] - before == 12000 + len(gzip.decompress(raw))
+
+
+def test_prefers_brotli_when_accepted(monkeypatch) -> None:
+    brotli = pytest.importorskip("brotli")
+    monkeypatch.setattr(settings, "compression_brotli_enabled", True)
+    client = _client()
+
+    with client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip, br"}) as response:
+        raw = b"".join(response.iter_raw())
+    assert response.headers["content-encoding"] == "br"
+    assert brotli.decompress(raw).count(b"\n") == 1000
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import asyncio
+
+import fakeredis
+import pytest
+
+from app.core.config import settings
+from app.core.idempotency import (
+    IdempotencyConflict,
+    IdempotencyMismatch,
+    idempotency_begin,
+    idempotency_fingerprint,
+    idempotency_release,
+    idempotency_store_response,
+)
+
+BODY = {"items": [{"sku": "a", "quantity": 1, "price": 2.0}]}
+FINGERPRINT = idempotency_fingerprint(BODY)
+
+
+def test_stored_response_is_replayed_only_for_the_same_body() -> None:
+    async def scenario() -> None:
+        redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+        assert await idempotency_begin(redis, 1, "k", FINGERPRINT) is None
+        await idempotency_store_response(redis, 1, "k", FINGERPRINT, {"id": "order-1"})
+
+        assert await idempotency_begin(redis, 1, "k", FINGERPRINT) == {"id": "order-1"}
+        with pytest.raises(IdempotencyMismatch):
+            await idempotency_begin(redis, 1, "k", idempotency_fingerprint({"items": []}))
+        assert await idempotency_begin(redis, 2, "k", FINGERPRINT) is None
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_duplicate_waits_for_the_first_response() -> None:
+    async def scenario() -> None:
+        redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+        assert await idempotency_begin(redis, 1, "k", FINGERPRINT) is None
+        duplicate = asyncio.create_task(idempotency_begin(redis, 1, "k", FINGERPRINT))
+        await asyncio.sleep(0.1)
+        assert not duplicate.done()
+
+        await idempotency_store_response(redis, 1, "k", FINGERPRINT, {"id": "order-1"})
+        assert await duplicate == {"id": "order-1"}
+
+    asyncio.run(scenario())
+
+
+def test_duplicate_takes_over_after_the_first_request_fails(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "idempotency_wait_seconds", 0.3)
+
+    async def scenario() -> None:
+        redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+        assert await idempotency_begin(redis, 1, "k", FINGERPRINT) is None
+        with pytest.raises(IdempotencyConflict):
+            await idempotency_begin(redis, 1, "k", FINGERPRINT)
+
+        duplicate = asyncio.create_task(idempotency_begin(redis, 1, "k", FINGERPRINT))
+        await asyncio.sleep(0.1)
+        await idempotency_release(redis, 1, "k")
+        assert await duplicate is None
+        assert await redis.exists("idem:1:k:lock")
+
+    asyncio.run(scenario())
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import uuid
+
+import fakeredis
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.exc import OperationalError
+
+import app.db.models  # noqa: F401
+from app.db.base import Base
+from app.db.models.order import Order, OrderStatus
+from app.worker import tasks
+
+
+def _engine_with_orders(statuses: list[OrderStatus]):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    ids = [uuid.uuid4() for _ in statuses]
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Order),
+            [
+                {"id": order_id, "user_id": 1, "items": [], "total_price": 0.0, "status": status}
+                for order_id, status in zip(ids, statuses)
+            ],
+        )
+    return engine, ids
+
+
+def _statuses(engine) -> dict[uuid.UUID, OrderStatus]:
+    with engine.connect() as conn:
+        return {row.id: row.status for row in conn.execute(select(Order.id, Order.status))}
+
+
+def test_batch_isolates_failures_and_updates_processed_orders_at_once(monkeypatch) -> None:
+    engine, (ok, broken, shipped) = _engine_with_orders(
+        [OrderStatus.PENDING, OrderStatus.PENDING, OrderStatus.SHIPPED]
+    )
+    requeued: list[tuple] = []
+    handled: list[uuid.UUID] = []
+
+    def handle_order(order_id: uuid.UUID) -> None:
+        if order_id == broken:
+            raise RuntimeError("boom")
+        handled.append(order_id)
+
+    monkeypatch.setattr(tasks, "get_sync_engine", lambda: engine)
+    monkeypatch.setattr(tasks, "get_sync_redis", lambda: fakeredis.FakeRedis())
+    monkeypatch.setattr(tasks, "handle_order", handle_order)
+    monkeypatch.setattr(tasks.process_orders_batch, "apply_async", lambda args, **kwargs: requeued.append(args))
+
+    result = tasks.process_orders_batch([str(ok), str(broken), str(shipped), "not-a-uuid"], OrderStatus.PAID.value)
+
+    assert result == {"processed": 2, "failed": [str(broken)]}
+    assert handled == [ok, shipped]
+    assert _statuses(engine) == {ok: OrderStatus.PAID, broken: OrderStatus.PENDING, shipped: OrderStatus.SHIPPED}
+    assert requeued == [([str(broken)], OrderStatus.PAID.value, 2)]
+
+
+def test_failed_bulk_update_is_retried_without_reprocessing(monkeypatch) -> None:
+    engine, (order_id,) = _engine_with_orders([OrderStatus.PENDING])
+    handled: list[uuid.UUID] = []
+    scheduled: list[tuple] = []
+
+    def failing_update(order_ids, status):
+        raise OperationalError("UPDATE orders", {}, Exception("connection lost"))
+
+    monkeypatch.setattr(tasks, "get_sync_engine", lambda: engine)
+    monkeypatch.setattr(tasks, "handle_order", handled.append)
+    monkeypatch.setattr(tasks, "_bulk_update_status", failing_update)
+    monkeypatch.setattr(tasks.update_orders_status, "apply_async", lambda args, **kwargs: scheduled.append(args))
+
+    tasks.process_orders_batch([str(order_id)], OrderStatus.PAID.value)
+
+    assert handled == [order_id]
+    assert scheduled == [([str(order_id)], OrderStatus.PAID.value)]
+
+
+def test_status_is_unchanged_without_an_explicit_status(monkeypatch) -> None:
+    engine, (order_id,) = _engine_with_orders([OrderStatus.PENDING])
+    monkeypatch.setattr(tasks, "get_sync_engine", lambda: engine)
+    monkeypatch.setattr(tasks, "handle_order", lambda order_id: None)
+
+    tasks.process_orders_batch([str(order_id)])
+    tasks.process_order(str(order_id))
+
+    assert _statuses(engine) == {order_id: OrderStatus.PENDING}
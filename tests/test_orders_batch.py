@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import uuid
+from types import SimpleNamespace
+
+import fakeredis
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+import app.db.models  # noqa: F401
+from app.api.routes import orders as orders_routes
+from app.core.cache import order_cache_key
+from app.db.base import Base
+from app.db.models.order import Order, OrderStatus
+
+
+class _RecordingWriter:
+    def __init__(self) -> None:
+        self.enqueued: list[uuid.UUID] = []
+
+    def enqueue(self, order_id: uuid.UUID, payload: dict) -> bool:
+        self.enqueued.append(order_id)
+        return True
+
+
+def _order_row(order_id: uuid.UUID, user_id: int) -> dict:
+    return {"id": order_id, "user_id": user_id, "items": [], "total_price": 1.0, "status": OrderStatus.PENDING}
+
+
+def test_batch_drops_foreign_and_unknown_ids_and_loads_misses_in_one_query(monkeypatch) -> None:
+    cached, own_miss, foreign_cached, foreign_miss, unknown = (uuid.uuid4() for _ in range(5))
+    redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+    writer = _RecordingWriter()
+    monkeypatch.setattr(orders_routes, "get_redis", lambda: redis)
+    monkeypatch.setattr(orders_routes, "cache_writer", writer)
+
+    async def scenario() -> tuple[list, list[str]]:
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(
+                insert(Order),
+                [_order_row(own_miss, 1), _order_row(foreign_miss, 2), _order_row(foreign_cached, 2)],
+            )
+        for order_id, user_id in ((cached, 1), (foreign_cached, 2)):
+            payload = {
+                "id": str(order_id),
+                "user_id": user_id,
+                "items": [],
+                "total_price": 1.0,
+                "status": "PENDING",
+                "created_at": "2026-01-01T00:00:00Z",
+            }
+            await redis.set(order_cache_key(order_id), json.dumps(payload))
+
+        statements: list[str] = []
+        event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+        ids = ",".join(str(order_id) for order_id in (cached, own_miss, foreign_cached, foreign_miss, unknown))
+        async with AsyncSession(engine) as db:
+            result = await orders_routes.get_orders_batch(ids=[ids], current_user=SimpleNamespace(id=1), db=db)
+        await engine.dispose()
+        return result, statements
+
+    result, statements = asyncio.run(scenario())
+
+    assert [order.id for order in result] == [cached, own_miss]
+    assert len(statements) == 1
+    assert " IN (" in statements[0]
+    assert sorted(writer.enqueued) == sorted([own_miss, foreign_miss])
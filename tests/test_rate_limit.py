@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.middleware.rate_limit import RateLimitMiddleware
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}/")
+    async def get_item(item_id: int) -> dict[str, int]:
+        return {"id": item_id}
+
+    app.add_middleware(RateLimitMiddleware)
+    return TestClient(app)
+
+
+def test_rate_limit_is_keyed_on_user_and_route_template(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "rate_limit_times", 2)
+    monkeypatch.setattr(settings, "rate_limit_user_times", 2)
+    client = _client()
+    alice = {"Authorization": f"Bearer {create_access_token('1', timedelta(minutes=5))}"}
+    bob = {"Authorization": f"Bearer {create_access_token('2', timedelta(minutes=5))}"}
+
+    codes = [client.get(f"/items/{item_id}/", headers=alice).status_code for item_id in (1, 2, 3)]
+    assert codes == [200, 200, 429]
+    assert client.get("/items/4/", headers=bob).status_code == 200
+
+
+def test_rate_limit_puts_unmatched_paths_in_one_bucket(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "rate_limit_times", 2)
+    client = _client()
+
+    codes = [client.get(f"/missing/{index}/").status_code for index in range(3)]
+    assert codes == [404, 404, 429]
+    assert client.get("/items/1/").status_code == 200
+
+
+def test_rate_limit_resolves_templates_of_included_routers(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "rate_limit_times", 2)
+    router = APIRouter()
+
+    @router.get("/orders/{order_id}/")
+    async def get_order(order_id: int) -> dict[str, int]:
+        return {"id": order_id}
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    app.add_middleware(RateLimitMiddleware)
+    client = TestClient(app)
+
+    codes = [client.get(f"/api/orders/{order_id}/").status_code for order_id in (1, 2, 3)]
+    assert codes == [200, 200, 429]
+
+
+def test_rate_limit_tier_claim_selects_its_own_quota(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "rate_limit_times", 1)
+    monkeypatch.setattr(settings, "rate_limit_user_times", 1)
+    monkeypatch.setattr(settings, "rate_limit_tiers_raw", "premium:3")
+    client = _client()
+    regular = {"Authorization": f"Bearer {create_access_token('1', timedelta(minutes=5), tier='user')}"}
+    premium = {"Authorization": f"Bearer {create_access_token('2', timedelta(minutes=5), tier='premium')}"}
+
+    assert [client.get("/items/1/", headers=regular).status_code for _ in range(2)] == [200, 429]
+    assert [client.get("/items/1/", headers=premium).status_code for _ in range(4)] == [200, 200, 200, 429]
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+import sys
+
+import pytest
+from pydantic import ValidationError
+
+from app.core.config import Settings, settings
+from app.core.security import (
+    JoseBackend,
+    TokenCache,
+    TokenError,
+    create_access_token,
+    decode_access_token,
+    get_jwt_backend,
+    token_cache,
+)
+
+
+def test_access_token_roundtrip_is_cached_and_compatible_with_jose() -> None:
+    token = create_access_token(subject="42", expires_delta=timedelta(minutes=5))
+
+    claims = decode_access_token(token)
+    assert claims["sub"] == "42"
+    assert decode_access_token(token) is claims
+    assert JoseBackend().decode(token, settings.jwt_secret_key, settings.algorithm)["sub"] == "42"
+
+    token_cache.clear()
+    with pytest.raises(TokenError):
+        decode_access_token(token + "x")
+
+
+def test_token_cache_respects_exp_and_size() -> None:
+    cache = TokenCache(max_size=2)
+    cache.put("a", {"sub": "1", "exp": 100})
+    cache.put("b", {"sub": "2", "exp": 200})
+    cache.put("c", {"sub": "3", "exp": 300})
+
+    assert cache.get("a", now=50) is None
+    assert cache.get("b", now=150) == {"sub": "2", "exp": 200}
+    assert cache.get("b", now=200) is None
+    assert cache.get("c", now=150) is not None
+
+
+def test_jwt_backend_is_validated_up_front(monkeypatch) -> None:
+    with pytest.raises(ValidationError):
+        Settings(jwt_backend="pyjwt2")
+
+    monkeypatch.setattr(settings, "jwt_backend", "pyjwt")
+    monkeypatch.setitem(sys.modules, "jwt", None)
+    get_jwt_backend.cache_clear()
+    try:
+        with pytest.raises(RuntimeError, match="PyJWT"):
+            get_jwt_backend()
+    finally:
+        get_jwt_backend.cache_clear()
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core import startup
+from app.core.config import settings
+
+
+# Without the clamp, 10 connections on a 2 + 1 pool wait on the barrier until the timeout;
+# the overflow connection is closed again on return, so two stay in the pool.
+@pytest.mark.parametrize(("requested", "opened"), [(10, 2), (0, 1), (-1, 1)])
+def test_prewarm_database_is_clamped_to_the_pool(monkeypatch, tmp_path, requested: int, opened: int) -> None:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'prewarm.db'}", pool_size=2, max_overflow=1)
+    monkeypatch.setattr(startup, "engine", engine)
+    monkeypatch.setattr(settings, "db_prewarm_connections", requested)
+
+    async def scenario() -> int:
+        await asyncio.wait_for(startup.prewarm_database(), timeout=5)
+        checked_in = engine.pool.checkedin()
+        await engine.dispose()
+        return checked_in
+
+    assert asyncio.run(scenario()) == opened
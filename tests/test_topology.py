@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import asyncio
+
+from app.core.config import settings
+from app.messaging.topology import (
+    DEAD_LETTER_REASON_HEADER,
+    RETRY_COUNT_HEADER,
+    dead_letter_queue_name,
+    retry_later,
+    retry_queue_name,
+)
+
+
+class _FakeMessage:
+    def __init__(self, headers: dict | None = None) -> None:
+        self.body = b'{"type": "new_order", "order_id": "x"}'
+        self.headers = headers or {}
+        self.content_type = "application/json"
+
+
+class _FakeExchange:
+    def __init__(self) -> None:
+        self.published: list[tuple[str, dict]] = []
+
+    async def publish(self, message, routing_key: str) -> None:
+        self.published.append((routing_key, dict(message.headers)))
+
+
+class _FakeChannel:
+    def __init__(self) -> None:
+        self.default_exchange = _FakeExchange()
+
+
+def test_retry_later_backs_off_then_dead_letters() -> None:
+    channel = _FakeChannel()
+    queue = settings.rabbitmq_queue_new_order
+    delays = settings.rabbitmq_retry_delays_ms
+
+    asyncio.run(retry_later(channel, _FakeMessage(), "down"))
+    asyncio.run(retry_later(channel, _FakeMessage({RETRY_COUNT_HEADER: settings.rabbitmq_max_retries - 1}), "down"))
+    asyncio.run(retry_later(channel, _FakeMessage({RETRY_COUNT_HEADER: settings.rabbitmq_max_retries}), "down"))
+
+    first, second, last = channel.default_exchange.published
+    assert first == (retry_queue_name(queue, delays[0]), {RETRY_COUNT_HEADER: 1})
+    assert second[0] == retry_queue_name(queue, delays[-1])
+    assert last[0] == dead_letter_queue_name(queue)
+    assert last[1][DEAD_LETTER_REASON_HEADER].startswith("max retries exceeded")